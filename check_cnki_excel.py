@@ -1,6 +1,20 @@
+import argparse
+import base64
+import hashlib
+import html
+import io
+import json
 import os
+import signal
+import socket
+import socketserver
+import sqlite3
+import subprocess
+import sys
 import threading
 import time
+from collections import namedtuple
+from typing import Protocol
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, filedialog
 import pandas as pd
@@ -9,11 +23,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import re
 import unicodedata
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 
 # ======== 知网检索页面基础 URL ========
@@ -27,6 +43,77 @@ BASE_SEARCH_URL = (
 OPEN_RETRY = 3
 OPEN_RETRY_DELAY = 3
 
+# 浏览器后端："selenium"（默认，经 chromedriver 转发）或 "cdp"（导航命令直连 Chrome DevTools websocket）
+BROWSER_BACKEND = "selenium"
+# cdp 后端等待页面 load 事件的超时（秒）
+CDP_PAGE_LOAD_TIMEOUT = 60
+
+# 本工具在用户目录下保存的缓存/历史数据
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".cnki_excel_tool")
+
+# WebDriver 命令追踪（调试性能用，默认关闭）：每个任务结束时输出命令统计，运行结束后导出折叠栈到 TRACE_OUTPUT_DIR
+TRACE_WEBDRIVER = False
+TRACE_OUTPUT_DIR = os.path.join(APP_DATA_DIR, "traces")
+
+# 记录“哪个备选选择器真正生效”，下次运行优先尝试
+SELECTOR_CACHE_FILE = os.path.join(APP_DATA_DIR, "selectors.json")
+# 备选选择器的快速探测时长（秒）：上次命中的选择器失效后，其余选择器只给这么多时间
+SELECTOR_PROBE_TIMEOUT = 0.8
+
+# 响应录制/回放（CDP Fetch 拦截）："off" 关闭；"record" 联网并录制；
+# "replay" 只从磁盘回放（完全离线，未录制的请求直接失败）；"auto" 命中回放、未命中联网并录制
+CACHE_MODE = "off"
+RESPONSE_CACHE_DIR = os.path.join(APP_DATA_DIR, "response_cache")
+RESPONSE_CACHE_MAX_MB = 500
+# 需要录制/回放的请求（CDP 通配符），覆盖 BASE_SEARCH_URL 页面及其结果列表请求
+CACHE_URL_PATTERNS = ["*://*.cnki.net/*"]
+
+# 结果列表抓包：从 Chrome performance 日志中取结果列表的 XHR 响应直接解析标题和页数，不等页面渲染（失败时回退到 DOM 抓取）
+CAPTURE_RESULTS_FROM_NETWORK = False
+# 候选结果列表请求的 URL 特征：BASE_SEARCH_URL 是 navi.cnki.net 的刊物详情页，列表由 /knavi/ 下的 XHR 加载
+# （具体接口随页面版本变化）；KNS8 检索页的结果表格接口一并保留。只看 XHR/Fetch 请求，
+# 响应能被 parse_result_list 识别为结果列表才采用，所以特征可以写得宽一些
+RESULT_LIST_URL_KEYWORDS = ["/knavi/", "/brief/grid", "/Brief/GetGridTableHtml"]
+# 点击后这么久（秒）还没有发出任何候选请求就放弃抓包、回退到页面抓取
+RESULT_CAPTURE_START_TIMEOUT = 1.5
+# 候选请求发出后最多等待其完成的时间（秒）
+RESULT_CAPTURE_TIMEOUT = 10
+
+# 浏览器会话回收：处理这么多行后重建 Chrome（0 表示不按行数回收）
+RECYCLE_AFTER_ROWS = 300
+# Chrome 全部进程常驻内存超过该值（MB）时重建（0 表示不检查）
+RECYCLE_MAX_RSS_MB = 2048
+# 会话在某个任务中崩溃时，重建后重试该任务的次数
+SESSION_CRASH_RETRIES = 1
+
+# 每个任务（同一日期的一组行）的时间预算（秒，0 表示不限制）：超时后看门狗中止该任务，行记为“超时，稍后重试”，
+# 全部日期处理完后再重试一次；超时后再过 ROW_TIMEOUT_GRACE 秒命令仍未返回，则强制结束浏览器并重建会话
+ROW_TIME_BUDGET = 240
+ROW_TIMEOUT_GRACE = 20
+
+# 预取下一个日期：再开一个浏览器会话，在扫描当前日期的同时打开页面并选好下一个日期（多占一个 Chrome 的内存）
+PREFETCH_NEXT_DATE = False
+
+# 分布式模式：worker 领取任务的租约时长（秒，执行期间每 1/3 租期续租一次）与每个任务的最多尝试次数
+QUEUE_LEASE_SECONDS = 300
+QUEUE_MAX_ATTEMPTS = 3
+# 协调者对其他机器上的 worker 提供队列服务的默认端口（SQLite 文件只能在协调者本机访问，不要放在网络共享目录）
+QUEUE_SERVER_PORT = 8765
+
+# 增量校验：同一工作簿（按文件名）再次校验时，日期和标题都没变的行沿用上次结论，只把新增/改动的行交给浏览器
+INCREMENTAL_VERIFY = True
+VERIFY_HISTORY_DB = os.path.join(APP_DATA_DIR, "verify_history.db")
+
+# 离线目录：从知网导出的题录文件（CSV / Excel / RefWorks / NoteExpress / EndNote）导入的 标题 -> 发表日期 索引
+# CATALOG_VERIFY 开启且已导入过题录时，目录覆盖到的行直接本地判定，只有未覆盖的行才打开浏览器
+CATALOG_VERIFY = True
+CATALOG_DB = os.path.join(APP_DATA_DIR, "catalog.db")
+
+
+# normalize_title_strict 用到的正则，预编译一次
+_ZERO_WIDTH_RE = re.compile(r"[\u200B-\u200D\uFEFF]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def normalize_title_strict(s: str) -> str:
     """
@@ -41,12 +128,125 @@ def normalize_title_strict(s: str) -> str:
     s = str(s)
     s = unicodedata.normalize("NFKC", s)
     # 移除零宽字符
-    s = re.sub(r"[\u200B-\u200D\uFEFF]", "", s)
+    s = _ZERO_WIDTH_RE.sub("", s)
     # 合并空白
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WHITESPACE_RE.sub(" ", s).strip()
     return s
 
 
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """normalize_title_strict 的向量化版本，titles 中的元素须均为字符串"""
+    return (
+        titles.str.normalize("NFKC")
+        .str.replace(_ZERO_WIDTH_RE, "", regex=True)
+        .str.replace(_WHITESPACE_RE, " ", regex=True)
+        .str.strip()
+    )
+
+
+# 预处理后交给浏览器校验的一行：Excel 行号、YYYY-MM-DD 日期、规范化后的标题
+RowTask = namedtuple("RowTask", ["row", "date", "title"])
+
+
+def preprocess_rows(df: pd.DataFrame):
+    """
+    在启动浏览器前整体校验并规范化“发布时间”“标题”两列（向量化，不逐行解析）
+    返回 (tasks, skipped)：
+    - tasks: [RowTask, ...]，按 Excel 行号排序
+    - skipped: [(Excel行号, 原因), ...]，发布时间为空 / 标题为空 / 日期格式错误的行
+    """
+    dates = df["发布时间"]
+    titles = df["标题"].astype(object)
+
+    # 已是日期类型的单元格（Timestamp 是 datetime 的子类）直接转换，其余按 YYYY-MM-DD / YYYY/MM/DD 文本解析
+    is_dt = dates.apply(isinstance, args=(datetime,))
+    from_dt = pd.to_datetime(dates.where(is_dt), errors="coerce")
+    text = dates.astype(str).str.strip().str.replace("/", "-", regex=False)
+    from_text = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+    parsed = from_dt.where(is_dt, from_text)
+
+    is_str = titles.apply(isinstance, args=(str,))
+    norm_titles = normalize_titles(titles.where(is_str, ""))
+
+    date_empty = dates.isna()
+    title_empty = norm_titles.eq("")
+    date_bad = parsed.isna()
+
+    # 按原逐行逻辑的先后顺序确定跳过原因：发布时间为空 > 标题为空 > 日期格式错误
+    reasons = pd.Series("", index=df.index, dtype=object)
+    reasons = reasons.mask(date_bad, "日期格式错误 - " + dates.astype(str))
+    reasons = reasons.mask(title_empty, "标题为空，跳过")
+    reasons = reasons.mask(date_empty, "发布时间为空，跳过")
+
+    excel_rows = pd.Series(df.index + 2, index=df.index)  # Excel行号（第1行是表头）
+    valid = reasons.eq("")
+    tasks = [
+        RowTask(int(r), d, t)
+        for r, d, t in zip(excel_rows[valid], parsed[valid].dt.strftime("%Y-%m-%d"), norm_titles[valid])
+    ]
+    skipped = [(int(r), reason) for r, reason in zip(excel_rows[~valid], reasons[~valid])]
+    return tasks, skipped
+
+
+class TitleMatcher:
+    """
+    Aho-Corasick 多模式匹配：对所有待查标题建一个自动机，
+    页面全文只需线性扫描一遍，就能找出其中出现的全部标题。
+    标题和被扫描的文本都应先经过 normalize_title_strict。
+    """
+
+    def __init__(self, titles):
+        self.titles = [t for t in dict.fromkeys(titles) if t]
+        # 状态转移表 / 失配指针 / 每个状态可输出的标题下标
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for i, t in enumerate(self.titles):
+            state = 0
+            for ch in t:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(i)
+
+        # BFS 构建失配指针，并把失配链上的输出合并进来
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> set:
+        """返回 text 中出现过的全部标题；全部找到后提前结束扫描"""
+        found = set()
+        if not self.titles:
+            return found
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for i in out[state]:
+                    found.add(self.titles[i])
+                if len(found) == len(self.titles):
+                    break
+        return found
+
+
 # ======== Selenium 启动配置 ========
 def make_driver():
     options = webdriver.ChromeOptions()
@@ -63,6 +263,9 @@ def make_driver():
     # 伪装为常见浏览器，绕过部分反自动化检测
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    if CAPTURE_RESULTS_FROM_NETWORK:
+        # 开启 performance 日志（含 Network 事件），用于直接读取结果列表的 XHR 响应
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     options.add_argument(
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.5993.117 Safari/537.36"
     )
@@ -81,9 +284,553 @@ def make_driver():
     return driver
 
 
+# ======== 浏览器后端：Selenium（默认）或直连 DevTools 协议 ========
+class BrowserBackend(Protocol):
+    """
+    select_date_by_click / find_titles_in_results 等导航代码用到的最小浏览器接口（结构化类型）。
+    Selenium 的 WebDriver 无需继承即满足该接口（默认后端，不做包装）；
+    后端还可以提供 execute_scripts(scripts) 在一次往返中执行多段脚本（见 execute_scripts 函数）；
+    find_element(s) 返回的元素需支持 text、get_attribute、get_dom_attribute、tag_name、
+    value_of_css_property、is_displayed、is_enabled、is_selected、click、find_element(s)
+    （Select 下拉框也依赖这些，select_by_visible_text 会用 value_of_css_property 检查选项是否可见）。
+    """
+
+    def get(self, url: str):
+        ...
+
+    @property
+    def current_url(self) -> str:
+        ...
+
+    @property
+    def title(self) -> str:
+        ...
+
+    def find_element(self, by: str, value: str):
+        ...
+
+    def find_elements(self, by: str, value: str) -> list:
+        ...
+
+    def execute_script(self, script: str, *args):
+        ...
+
+    def quit(self):
+        ...
+
+
+class CdpError(WebDriverException):
+    pass
+
+
+class CdpConnection:
+    """
+    到单个页面 target 的持久 websocket 连接（websocket-client 随 Selenium 4 一同安装）
+    支持流水线：先连续发送多条命令，再按 id 收取结果，减少往返等待
+    """
+
+    def __init__(self, ws_url: str, timeout: float = 30):
+        import websocket
+        self._timeout = timeout
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._next_id = 0
+        self._responses = {}
+        self._event_counts = {}
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+    def send(self, method: str, params: dict = None) -> int:
+        self._next_id += 1
+        self._ws.send(json.dumps({"id": self._next_id, "method": method, "params": params or {}}))
+        return self._next_id
+
+    def _read_one(self):
+        msg = json.loads(self._ws.recv())
+        if "id" in msg:
+            self._responses[msg["id"]] = msg
+        elif "method" in msg:
+            self._event_counts[msg["method"]] = self._event_counts.get(msg["method"], 0) + 1
+
+    def recv(self, msg_id: int) -> dict:
+        while msg_id not in self._responses:
+            self._read_one()
+        msg = self._responses.pop(msg_id)
+        if "error" in msg:
+            raise CdpError(f"{msg['error'].get('message')} {msg['error'].get('data', '')}".strip())
+        return msg.get("result", {})
+
+    def call(self, method: str, params: dict = None) -> dict:
+        return self.recv(self.send(method, params))
+
+    def batch(self, calls) -> list:
+        """calls: [(method, params), ...]，一次性发出后依次收取结果"""
+        ids = [self.send(method, params) for method, params in calls]
+        return [self.recv(i) for i in ids]
+
+    def event_count(self, method: str) -> int:
+        return self._event_counts.get(method, 0)
+
+    def wait_event(self, method: str, after_count: int, timeout: float) -> bool:
+        """等待 method 事件的累计次数超过 after_count"""
+        deadline = time.time() + timeout
+        try:
+            while self.event_count(method) <= after_count:
+                if time.time() >= deadline:
+                    return False
+                self._ws.settimeout(max(0.1, deadline - time.time()))
+                try:
+                    self._read_one()
+                except Exception as e:
+                    if type(e).__name__ != "WebSocketTimeoutException":
+                        raise
+            return True
+        finally:
+            self._ws.settimeout(self._timeout)
+
+
+# 按 Selenium 的定位方式在 root（document 或元素）下查找，all 为 true 时返回数组
+_CDP_FIND_JS = """
+function(root, by, value, all) {
+    var doc = root.ownerDocument || root;
+    if (by === 'xpath') {
+        if (all) {
+            var snap = doc.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var out = [];
+            for (var i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+            return out;
+        }
+        return doc.evaluate(value, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    var css = value;
+    if (by === 'id') css = '#' + CSS.escape(value);
+    else if (by === 'class name') css = '.' + CSS.escape(value);
+    else if (by === 'name') css = '[name="' + value.replace(/"/g, '\\\\"') + '"]';
+    return all ? Array.prototype.slice.call(root.querySelectorAll(css)) : root.querySelector(css);
+}
+"""
+
+
+class CdpElement:
+    """DOM 节点的远程引用（Runtime objectId），接口与 Selenium WebElement 的常用部分一致"""
+
+    def __init__(self, driver, object_id: str):
+        self._driver = driver
+        self.object_id = object_id
+
+    def _call(self, function: str, *args):
+        return self._driver._call_on(self.object_id, function, *args)
+
+    @property
+    def text(self) -> str:
+        return self._call("function() { return this.innerText || ''; }")
+
+    @property
+    def tag_name(self) -> str:
+        return self._call("function() { return this.tagName.toLowerCase(); }")
+
+    def get_attribute(self, name: str):
+        return self._call(
+            """function(n) {
+                var v = this[n];
+                if (v === undefined || v === null || typeof v === 'object' || typeof v === 'function') v = this.getAttribute(n);
+                return v === undefined || v === null ? null : String(v);
+            }""",
+            name,
+        )
+
+    def get_dom_attribute(self, name: str):
+        return self._call("function(n) { return this.getAttribute(n); }", name)
+
+    def value_of_css_property(self, name: str) -> str:
+        return self._call("function(n) { return window.getComputedStyle(this).getPropertyValue(n); }", name)
+
+    def is_displayed(self) -> bool:
+        return self._call(
+            """function() {
+                var s = window.getComputedStyle(this);
+                return this.getClientRects().length > 0 && s.visibility !== 'hidden';
+            }"""
+        )
+
+    def is_enabled(self) -> bool:
+        return self._call("function() { return !this.disabled; }")
+
+    def is_selected(self) -> bool:
+        return self._call("function() { return !!(this.selected || this.checked); }")
+
+    def click(self):
+        self._call(
+            """function() {
+                this.scrollIntoView({block: 'center'});
+                if (this.tagName === 'OPTION') {
+                    this.selected = true;
+                    var sel = this.closest('select');
+                    if (sel) sel.dispatchEvent(new Event('change', {bubbles: true}));
+                } else {
+                    this.click();
+                }
+            }"""
+        )
+
+    def clear(self):
+        self._call(
+            "function() { this.value = ''; this.dispatchEvent(new Event('input', {bubbles: true})); }"
+        )
+
+    def send_keys(self, text: str):
+        self._call("function() { this.focus(); }")
+        conn = self._driver._conn
+        for part in re.split(r"(\n)", text):
+            if part == "\n":
+                key = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13, "text": "\r"}
+                conn.batch([
+                    ("Input.dispatchKeyEvent", dict(key, type="keyDown")),
+                    ("Input.dispatchKeyEvent", dict(key, type="keyUp")),
+                ])
+            elif part:
+                conn.call("Input.insertText", {"text": part})
+
+    def find_element(self, by: str, value: str):
+        return self._driver._find(self.object_id, by, value)
+
+    def find_elements(self, by: str, value: str) -> list:
+        return self._driver._find_all(self.object_id, by, value)
+
+
+class CdpDriver(BrowserBackend):
+    """
+    直连 Chrome DevTools 协议的后端：Chrome 仍由 Selenium 启动和关闭（沿用 make_driver 的全部配置），
+    但导航、查找元素、读取文本、执行脚本都走到页面 target 的持久 websocket，不再经过 chromedriver 转发。
+    execute_script 只支持返回可 JSON 序列化的值（本工具的脚本均如此）。
+    其余属性（execute_cdp_cmd、service、bidi_connection 等）转交给底层 Selenium driver。
+    """
+
+    def __init__(self, selenium_driver, page_load_timeout: float = None):
+        self._selenium = selenium_driver
+        self.page_load_timeout = page_load_timeout or CDP_PAGE_LOAD_TIMEOUT
+        address = selenium_driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        # Chrome 的窗口句柄就是页面 target id
+        target_id = selenium_driver.current_window_handle
+        self._conn = CdpConnection(f"ws://{address}/devtools/page/{target_id}")
+        self._conn.call("Page.enable")
+
+    def __getattr__(self, name):
+        return getattr(self._selenium, name)
+
+    # ---- 内部：在页面里执行函数 ----
+    @staticmethod
+    def _arg(value):
+        if isinstance(value, CdpElement):
+            return {"objectId": value.object_id}
+        if isinstance(value, (list, tuple)):
+            value = list(value)
+        return {"value": value}
+
+    @staticmethod
+    def _check(result: dict):
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            desc = details.get("exception", {}).get("description") or details.get("text")
+            raise CdpError(f"页面脚本出错：{desc}")
+        return result["result"]
+
+    def _call_on(self, object_id: str, function: str, *args, by_value: bool = True):
+        result = self._conn.call("Runtime.callFunctionOn", {
+            "objectId": object_id,
+            "functionDeclaration": function,
+            "arguments": [self._arg(a) for a in args],
+            "returnByValue": by_value,
+        })
+        remote = self._check(result)
+        return remote.get("value") if by_value else remote
+
+    def _evaluate(self, expression: str, by_value: bool = True):
+        remote = self._check(self._conn.call("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": by_value,
+        }))
+        return remote.get("value") if by_value else remote
+
+    def _find_remote(self, root_id, by: str, value: str, all_: bool) -> dict:
+        """root_id 为 None 时在 document 下查找（参数内联进表达式，一次往返）"""
+        if root_id is None:
+            return self._evaluate(
+                f"({_CDP_FIND_JS})(document, {json.dumps(by)}, {json.dumps(value)}, {json.dumps(all_)})",
+                by_value=False,
+            )
+        return self._call_on(
+            root_id, f"function(by, value, all) {{ return ({_CDP_FIND_JS})(this, by, value, all); }}",
+            by, value, all_, by_value=False,
+        )
+
+    def _find(self, root_id, by: str, value: str):
+        remote = self._find_remote(root_id, by, value, False)
+        if remote.get("subtype") == "null" or "objectId" not in remote:
+            raise NoSuchElementException(f"找不到元素：{by}={value}")
+        return CdpElement(self, remote["objectId"])
+
+    def _find_all(self, root_id, by: str, value: str) -> list:
+        remote = self._find_remote(root_id, by, value, True)
+        props = self._conn.call("Runtime.getProperties", {"objectId": remote["objectId"], "ownProperties": True})
+        items = []
+        for p in props.get("result", []):
+            if p.get("name", "").isdigit() and "objectId" in p.get("value", {}):
+                items.append((int(p["name"]), CdpElement(self, p["value"]["objectId"])))
+        return [el for _, el in sorted(items, key=lambda x: x[0])]
+
+    # ---- BrowserBackend 接口 ----
+    def get(self, url: str):
+        loads = self._conn.event_count("Page.loadEventFired")
+        result = self._conn.call("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise CdpError(result["errorText"])
+        if not self._conn.wait_event("Page.loadEventFired", loads, self.page_load_timeout):
+            raise CdpError(f"页面加载超时（{self.page_load_timeout} 秒）：{url}")
+
+    @property
+    def current_url(self) -> str:
+        return self.execute_script("return location.href;")
+
+    @property
+    def title(self) -> str:
+        return self.execute_script("return document.title;")
+
+    def find_element(self, by: str, value: str):
+        return self._find(None, by, value)
+
+    def find_elements(self, by: str, value: str) -> list:
+        return self._find_all(None, by, value)
+
+    def execute_script(self, script: str, *args):
+        elements = [a for a in args if isinstance(a, CdpElement)]
+        if not elements:
+            # 没有元素参数时把参数以 JSON 内联，一次 Runtime.evaluate 即可
+            return self._evaluate(f"(function() {{\n{script}\n}}).apply(window, {json.dumps(list(args))})")
+        wrapped = f"function() {{ return (function() {{\n{script}\n}}).apply(window, arguments); }}"
+        return self._call_on(elements[0].object_id, wrapped, *args)
+
+    def execute_scripts(self, scripts) -> list:
+        """流水线批量执行多段无参数脚本，一次往返取回全部结果（经 execute_scripts 函数调用）"""
+        results = self._conn.batch([
+            ("Runtime.evaluate", {"expression": f"(function() {{\n{s}\n}})()", "returnByValue": True})
+            for s in scripts
+        ])
+        return [self._check(r).get("value") for r in results]
+
+    def quit(self):
+        self._conn.close()
+        self._selenium.quit()
+
+
+# ======== WebDriver 命令追踪：按命令类型/调用函数统计次数与耗时 ========
+class CommandTracer:
+    """
+    统计经 TracingDriver 发出的每条浏览器命令（含元素上的 .text、get_attribute 等）：
+    - 按命令类型、按“调用函数 + 命令”汇总次数与耗时
+    - 每个任务（日期分组）单独汇总，便于定位最慢的行；只计调用 begin_row 的线程发出的命令，
+      预取线程（PREFETCH_NEXT_DATE）的命令不计入当前任务
+    - 导出折叠栈（flamegraph.pl / speedscope 可直接读取），单位为微秒
+    """
+
+    # 追踪代理自身的栈帧不计入调用栈
+    _SELF_PREFIXES = ("CommandTracer", "_TracingProxy", "TracingDriver", "TracingElement")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = os.path.basename(__file__)
+        self.by_command = {}      # 命令 -> [次数, 秒]
+        self.by_caller = {}       # (调用函数, 命令) -> [次数, 秒]
+        self.folded = {}          # "外层;...;内层;命令" -> 秒
+        self.rows = []            # [(任务名, 次数, 秒), ...]
+        # 各线程的当前任务：[任务名, 次数, 秒, {命令: [次数, 秒]}]
+        self._local = threading.local()
+
+    def _call_stack(self) -> list:
+        """本文件内的调用链（外层在前），如 ['process_excel', 'check_titles_at_date', 'find_titles_in_results']"""
+        names = []
+        f = sys._getframe(2)
+        while f is not None:
+            code = f.f_code
+            if os.path.basename(code.co_filename) == self._source:
+                name = getattr(code, "co_qualname", code.co_name)
+                if not name.startswith(self._SELF_PREFIXES) and name != "<module>":
+                    names.append(name)
+            f = f.f_back
+        names.reverse()
+        return names
+
+    def record(self, command: str, seconds: float):
+        stack = self._call_stack()
+        caller = stack[-1] if stack else "?"
+        folded_key = ";".join(stack + [command])
+        with self._lock:
+            for table, key in ((self.by_command, command), (self.by_caller, (caller, command))):
+                stat = table.setdefault(key, [0, 0.0])
+                stat[0] += 1
+                stat[1] += seconds
+            self.folded[folded_key] = self.folded.get(folded_key, 0.0) + seconds
+        row = getattr(self._local, "row", None)
+        if row is not None:
+            row[1] += 1
+            row[2] += seconds
+            stat = row[3].setdefault(command, [0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+
+    def begin_row(self, label: str):
+        self._local.row = [label, 0, 0.0, {}]
+
+    def end_row(self) -> str:
+        """结束当前线程的当前任务，返回一行摘要"""
+        row, self._local.row = getattr(self._local, "row", None), None
+        if row is None:
+            return ""
+        label, count, seconds, commands = row
+        with self._lock:
+            self.rows.append((label, count, seconds))
+        top = sorted(commands.items(), key=lambda kv: kv[1][1], reverse=True)[:5]
+        detail = "，".join(f"{cmd}×{n} {sec:.2f}s" for cmd, (n, sec) in top)
+        return f"[命令追踪] {label}：{count} 条命令，{seconds:.2f} 秒（{detail}）"
+
+    def summary(self, top: int = 15) -> str:
+        with self._lock:
+            by_command = sorted(self.by_command.items(), key=lambda kv: kv[1][1], reverse=True)
+            by_caller = sorted(self.by_caller.items(), key=lambda kv: kv[1][1], reverse=True)
+            rows = sorted(self.rows, key=lambda r: r[2], reverse=True)
+        total_n = sum(n for n, _ in self.by_command.values())
+        total_s = sum(s for _, s in self.by_command.values())
+        lines = [f"WebDriver 命令共 {total_n} 条，耗时 {total_s:.2f} 秒", "", "按命令类型："]
+        lines += [f"  {cmd:<24}{n:>8} 次{sec:>10.2f} 秒" for cmd, (n, sec) in by_command[:top]]
+        lines += ["", "按调用函数："]
+        lines += [f"  {caller} → {cmd:<20}{n:>8} 次{sec:>10.2f} 秒" for (caller, cmd), (n, sec) in by_caller[:top]]
+        if rows:
+            lines += ["", "最慢的任务："]
+            lines += [f"  {label}：{n} 条命令，{sec:.2f} 秒" for label, n, sec in rows[:top]]
+        return "\n".join(lines)
+
+    def export(self, out_dir: str = None) -> tuple:
+        """写出折叠栈文件和文本摘要，返回 (折叠栈路径, 摘要路径)"""
+        out_dir = out_dir or TRACE_OUTPUT_DIR
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        folded_path = os.path.join(out_dir, f"trace-{stamp}.folded")
+        summary_path = os.path.join(out_dir, f"trace-{stamp}-summary.txt")
+        with self._lock:
+            folded = dict(self.folded)
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(folded.items()):
+                f.write(f"{stack} {max(1, int(seconds * 1e6))}\n")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary(top=50) + "\n")
+        return folded_path, summary_path
+
+
+class _TracingProxy:
+    """把对被包装对象的方法调用和属性读取都计为一条命令；返回的元素继续包装"""
+
+    def __init__(self, target, tracer: CommandTracer):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_tracer", tracer)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def _wrap(self, value):
+        if isinstance(value, (WebElement, CdpElement)):
+            return TracingElement(value, self._tracer)
+        if isinstance(value, list) and value and isinstance(value[0], (WebElement, CdpElement)):
+            return [TracingElement(v, self._tracer) for v in value]
+        return value
+
+    @staticmethod
+    def _unwrap(value):
+        if isinstance(value, _TracingProxy):
+            return value._target
+        if isinstance(value, (list, tuple)):
+            return type(value)(_TracingProxy._unwrap(v) for v in value)
+        return value
+
+    def __getattr__(self, name):
+        start = time.perf_counter()
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            # 属性读取（.text、current_url、title 等）本身就是一次命令
+            self._tracer.record(name, time.perf_counter() - start)
+            return self._wrap(attr)
+
+        def traced(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return self._wrap(attr(*self._unwrap(args), **{k: self._unwrap(v) for k, v in kwargs.items()}))
+            finally:
+                self._tracer.record(name, time.perf_counter() - t0)
+
+        return traced
+
+    def __eq__(self, other):
+        return self._target == self._unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+
+class TracingDriver(_TracingProxy):
+    pass
+
+
+class TracingElement(_TracingProxy):
+    pass
+
+
+_COMMAND_TRACER = None
+
+
+def get_command_tracer() -> CommandTracer:
+    """TRACE_WEBDRIVER 开启时返回本进程共用的追踪器（浏览器回收后继续累计），否则返回 None"""
+    global _COMMAND_TRACER
+    if not TRACE_WEBDRIVER:
+        return None
+    if _COMMAND_TRACER is None:
+        _COMMAND_TRACER = CommandTracer()
+    return _COMMAND_TRACER
+
+
+def execute_scripts(driver, scripts) -> list:
+    """
+    一次往返执行多段无参数脚本（每段用 return 返回结果），按顺序返回结果列表
+    后端自带 execute_scripts（CdpDriver 的流水线批量执行）时用它，否则合并成一次 execute_script
+    """
+    if hasattr(driver, "execute_scripts"):
+        return driver.execute_scripts(scripts)
+    body = ",\n".join(f"(function() {{\n{s}\n}})()" for s in scripts)
+    return driver.execute_script(f"return [\n{body}\n];")
+
+
+def make_browser() -> BrowserBackend:
+    """
+    按 BROWSER_BACKEND 创建浏览器：默认直接返回 Selenium driver，"cdp" 时包装为 CdpDriver；
+    TRACE_WEBDRIVER 开启时再套一层 TracingDriver
+    """
+    driver = make_driver()
+    if BROWSER_BACKEND == "cdp":
+        try:
+            driver = CdpDriver(driver)
+        except Exception as e:
+            print(f"连接 DevTools 失败，改用 Selenium 后端：{e}")
+    tracer = get_command_tracer()
+    if tracer is not None:
+        driver = TracingDriver(driver, tracer)
+    return driver
+
+
 # ======== 打开页面，带重试，缓解 ERR_CONNECTION_CLOSED ========
 def open_page_with_retry(driver, url: str, retries: int = OPEN_RETRY, delay: int = OPEN_RETRY_DELAY) -> bool:
     for i in range(retries):
+        check_row_deadline()
         try:
             driver.get(url)
             return True
@@ -98,6 +845,439 @@ def open_page_with_retry(driver, url: str, retries: int = OPEN_RETRY, delay: int
     return False
 
 
+# ======== 响应录制/回放：CDP Fetch 拦截，响应按内容寻址存盘 ========
+class ResponseCache:
+    """
+    磁盘响应缓存：index.json 记录 请求键 → 状态码/响应头/正文摘要，
+    正文按 sha256 存在 blobs/ 下（相同内容只存一份），总大小超过上限时按最近最少使用淘汰。
+    索引只在内存中更新，最多每 _SAVE_INTERVAL 秒写盘一次，flush() 时写回剩余改动。
+    """
+
+    # 正文已由浏览器解码，回放时这些头会与正文不符，不保存
+    _DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+    _SAVE_INTERVAL = 30
+
+    def __init__(self, root: str = RESPONSE_CACHE_DIR, max_bytes: int = RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(root, "index.json")
+        self._entries = {}
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except (OSError, ValueError):
+            pass
+        # 正文文件的引用计数与大小、正文总大小，随 put/淘汰增量维护，避免每次都遍历整个索引
+        self._blobs = {}
+        self._total = 0
+        for entry in self._entries.values():
+            self._add_ref(entry)
+        self._dirty = False
+        self._saved_at = time.time()
+
+    def _add_ref(self, entry):
+        blob = self._blobs.setdefault(entry["blob"], [0, entry["size"]])
+        if blob[0] == 0:
+            self._total += blob[1]
+        blob[0] += 1
+
+    def _drop_ref(self, entry):
+        """减少引用计数，正文不再被引用时删除文件"""
+        digest = entry["blob"]
+        blob = self._blobs.get(digest)
+        if blob is None:
+            return
+        blob[0] -= 1
+        if blob[0] <= 0:
+            self._total -= blob[1]
+            del self._blobs[digest]
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    @staticmethod
+    def request_key(method: str, url: str, post_data: str = None) -> str:
+        """请求键：方法 + URL（去掉 _=时间戳 之类的防缓存参数）+ 请求体"""
+        parts = urlsplit(url)
+        query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "_"])
+        url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+        raw = f"{method.upper()}\n{url}\n{post_data or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def get(self, key: str):
+        """命中返回 (状态码, [(头名, 头值)], 正文bytes)，未命中返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            try:
+                with open(self._blob_path(entry["blob"]), "rb") as f:
+                    body = f.read()
+            except OSError:
+                self._drop_ref(self._entries.pop(key))
+                self._dirty = True
+                return None
+            entry["atime"] = time.time()
+            self._dirty = True
+            return entry["status"], entry["headers"], body
+
+    def put(self, key: str, url: str, status: int, headers, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        headers = [[n, v] for n, v in headers if n.lower() not in self._DROP_HEADERS]
+        with self._lock:
+            path = self._blob_path(digest)
+            try:
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = path + ".tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(body)
+                    os.replace(tmp, path)
+            except OSError as e:
+                print(f"[响应缓存] 写入失败：{e}")
+                return
+            entry = {
+                "url": url,
+                "status": status,
+                "headers": headers,
+                "blob": digest,
+                "size": len(body),
+                "atime": time.time(),
+            }
+            # 先加新引用再释放旧引用：同一请求重新录到相同内容时不会误删正文文件
+            self._add_ref(entry)
+            old = self._entries.get(key)
+            self._entries[key] = entry
+            if old is not None:
+                self._drop_ref(old)
+            self._evict()
+            self._dirty = True
+            if time.time() - self._saved_at >= self._SAVE_INTERVAL:
+                self._save()
+
+    def _evict(self):
+        """按最近最少使用淘汰，直到正文总大小不超过上限；不再被引用的正文文件一并删除"""
+        if self._total <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["atime"]):
+            if self._total <= self.max_bytes:
+                break
+            self._drop_ref(self._entries.pop(key))
+
+    def _save(self):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = self._index_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self._index_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"[响应缓存] 保存索引失败：{e}")
+        self._saved_at = time.time()
+
+    def flush(self):
+        """把访问时间、新录制的条目等改动写回索引"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+
+_RESPONSE_CACHE = None
+
+
+def get_response_cache() -> ResponseCache:
+    """同一进程内的所有浏览器会话共用一个缓存对象"""
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        _RESPONSE_CACHE = ResponseCache()
+    return _RESPONSE_CACHE
+
+
+class FetchInterceptor:
+    """
+    在 Selenium 会话上用 CDP Fetch 域拦截 CACHE_URL_PATTERNS 匹配的请求
+    （Selenium 4 自带的 trio CDP 客户端，在后台线程里跑事件循环）：
+    - record：照常联网，把 200 响应录入 ResponseCache
+    - replay：只从磁盘回放，未录制的请求直接失败（完全离线）
+    - auto：命中则回放，未命中联网并录入
+    """
+
+    def __init__(self, driver, cache: ResponseCache, mode: str):
+        self.driver = driver
+        self.cache = cache
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._ready = threading.Event()
+        self._error = None
+        self._token = None
+        self._scope = None
+        self._thread = None
+
+    def start(self) -> bool:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(15) or self._error is not None:
+            print(f"[响应缓存] 启动 CDP 拦截失败：{self._error or '超时'}，本次不使用缓存")
+            self.stop()
+            return False
+        print(f"[响应缓存] 已启用，模式：{self.mode}")
+        return True
+
+    def stop(self):
+        if self._scope is not None and self._token is not None:
+            try:
+                import trio
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        self.cache.flush()
+        if self._error is None:
+            print(f"[响应缓存] 命中 {self.hits}，未命中 {self.misses}，录制 {self.stored}")
+
+    def _run(self):
+        try:
+            import trio
+            trio.run(self._main)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    async def _main(self):
+        import trio
+        self._token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as scope:
+            self._scope = scope
+            async with self.driver.bidi_connection() as conn:
+                session, devtools = conn.session, conn.devtools
+                fetch = devtools.fetch
+                patterns = []
+                for url_pattern in CACHE_URL_PATTERNS:
+                    if self.mode in ("replay", "auto"):
+                        patterns.append(fetch.RequestPattern(
+                            url_pattern=url_pattern, request_stage=fetch.RequestStage.REQUEST))
+                    if self.mode in ("record", "auto"):
+                        patterns.append(fetch.RequestPattern(
+                            url_pattern=url_pattern, request_stage=fetch.RequestStage.RESPONSE))
+                # 缓冲区要足够大，事件被丢弃的话对应请求会一直挂起
+                events = session.listen(fetch.RequestPaused, buffer_size=1000)
+                await session.execute(fetch.enable(patterns=patterns))
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for event in events:
+                        nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        import trio
+        fetch = devtools.fetch
+        req = event.request
+        key = ResponseCache.request_key(req.method, req.url, getattr(req, "post_data", None))
+        try:
+            if event.response_status_code is None and event.response_error_reason is None:
+                # 请求阶段：尝试从磁盘回放
+                hit = self.cache.get(key)
+                if hit is not None:
+                    status, headers, body = hit
+                    self.hits += 1
+                    await session.execute(fetch.fulfill_request(
+                        request_id=event.request_id,
+                        response_code=status,
+                        response_headers=[fetch.HeaderEntry(name=n, value=v) for n, v in headers],
+                        body=base64.b64encode(body).decode("ascii"),
+                    ))
+                    return
+                self.misses += 1
+                if self.mode == "replay":
+                    print(f"[响应缓存] 未录制，离线回放模式下拒绝请求：{req.url[:100]}")
+                    await session.execute(fetch.fail_request(
+                        request_id=event.request_id,
+                        error_reason=devtools.network.ErrorReason.INTERNET_DISCONNECTED,
+                    ))
+                    return
+            elif event.response_status_code == 200:
+                # 响应阶段：录制
+                body, is_base64 = await session.execute(fetch.get_response_body(request_id=event.request_id))
+                data = base64.b64decode(body) if is_base64 else body.encode("utf-8")
+                headers = [(h.name, h.value) for h in (event.response_headers or [])]
+                # 写正文文件、淘汰都是磁盘操作，放到工作线程里做，不阻塞其他被暂停请求的处理
+                await trio.to_thread.run_sync(self.cache.put, key, req.url, 200, headers, data)
+                self.stored += 1
+            await session.execute(fetch.continue_request(request_id=event.request_id))
+        except Exception as e:
+            print(f"[响应缓存] 处理请求失败：{req.url[:100]} {e}")
+            try:
+                await session.execute(fetch.continue_request(request_id=event.request_id))
+            except Exception:
+                pass
+
+
+def attach_response_cache(driver, mode: str = None):
+    """按 CACHE_MODE 在会话上启用录制/回放，返回 FetchInterceptor；未启用或失败返回 None"""
+    mode = mode or CACHE_MODE
+    if mode not in ("record", "replay", "auto"):
+        return None
+    interceptor = FetchInterceptor(driver, get_response_cache(), mode)
+    return interceptor if interceptor.start() else None
+
+
+# ======== 选择器学习：记住命中的选择器，备选项一次 JS 调用快速探测 ========
+class SelectorRegistry:
+    """
+    记录每组备选选择器中实际生效的那一个（按组名区分），
+    后续行、后续运行都优先尝试它；结果持久化到 SELECTOR_CACHE_FILE。
+    选择器写作 (By, 值) 二元组，值里可以带 {year} 之类的占位符，记录的是模板本身。
+    """
+
+    def __init__(self, path: str = SELECTOR_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hits = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._hits = {k: v for k, v in data.items() if isinstance(v, str)}
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def key(selector) -> str:
+        by, value = selector
+        return f"{by}|{value}"
+
+    def remembered(self, group: str, candidates):
+        hit = self._hits.get(group)
+        for c in candidates:
+            if self.key(c) == hit:
+                return c
+        return None
+
+    def ordered(self, group: str, candidates) -> list:
+        """上次命中的排在最前，其余保持原顺序"""
+        hit = self.remembered(group, candidates)
+        if hit is None:
+            return list(candidates)
+        return [hit] + [c for c in candidates if c is not hit]
+
+    def record(self, group: str, selector):
+        key = self.key(selector)
+        with self._lock:
+            if self._hits.get(group) == key:
+                return
+            self._hits[group] = key
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                # 多个本机 worker 共用该文件：先写各自的临时文件再整体替换，读到的总是完整的 JSON
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._hits, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"保存选择器缓存失败：{e}")
+
+
+SELECTOR_REGISTRY = SelectorRegistry()
+
+# 一次往返里按顺序探测所有选择器，返回第一个命中的下标（都不命中返回 -1）
+# 与 find_element 一致，每个选择器只看第一个匹配节点
+_PROBE_SELECTORS_JS = """
+var sels = arguments[0], visibleOnly = arguments[1], rejectClass = arguments[2];
+for (var i = 0; i < sels.length; i++) {
+    var by = sels[i][0], q = sels[i][1], el = null;
+    try {
+        if (by === 'xpath') {
+            el = document.evaluate(q, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (by === 'id') {
+            el = document.getElementById(q);
+        } else {
+            el = document.querySelector(q);
+        }
+    } catch (e) {
+        el = null;
+    }
+    if (!el) continue;
+    if (visibleOnly && !(el.getClientRects && el.getClientRects().length > 0)) continue;
+    if (rejectClass && new RegExp(rejectClass, 'i').test(el.getAttribute('class') || '')) continue;
+    return i;
+}
+return -1;
+"""
+
+
+def find_by_selectors(driver, group: str, candidates, timeout: float = 10, clickable: bool = False,
+                      reject_class: str = "", debug_print=None, **fmt):
+    """
+    按备选选择器查找元素，返回 (元素, 命中的选择器模板)，找不到返回 (None, None)
+    - 上次命中的选择器按正常超时 timeout 等待（页面可能仍在加载）
+    - 其余选择器每轮用一次 execute_script 全部探测，总时长不超过 timeout；
+      若上次命中的已失效，说明页面已加载完，只再给 SELECTOR_PROBE_TIMEOUT
+    reject_class: 元素 class 匹配该正则（忽略大小写）时视为不可用，如 'disable'
+    fmt: 用于填充选择器模板中的占位符
+    """
+    def log(msg):
+        if debug_print:
+            debug_print(msg)
+
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    ordered = SELECTOR_REGISTRY.ordered(group, candidates)
+    resolved = [(by, value.format(**fmt) if fmt else value) for by, value in ordered]
+
+    start = 0
+    if SELECTOR_REGISTRY.remembered(group, candidates) is not None:
+        try:
+            el = WebDriverWait(driver, timeout).until(condition(resolved[0]))
+            classes = (el.get_attribute("class") or "") if reject_class else ""
+            if not (reject_class and re.search(reject_class, classes, re.I)):
+                log(f"  ✓ 命中上次生效的选择器: {resolved[0][1]}")
+                return el, ordered[0]
+            log(f"  ✗ 上次生效的选择器元素不可用 (class={classes})")
+        except Exception as e:
+            log(f"  ✗ 上次生效的选择器失效: {str(e)[:50]}")
+        start = 1
+        timeout = min(timeout, SELECTOR_PROBE_TIMEOUT)
+
+    rest = resolved[start:]
+    if not rest:
+        return None, None
+    log(f"  一次性探测 {len(rest)} 个备选选择器...")
+    deadline = time.time() + timeout
+    while True:
+        try:
+            idx = driver.execute_script(_PROBE_SELECTORS_JS, [list(s) for s in rest], clickable, reject_class)
+        except Exception as e:
+            log(f"  ✗ 选择器探测脚本执行失败: {str(e)[:50]}")
+            idx = -1
+        if isinstance(idx, int) and 0 <= idx < len(rest):
+            break
+        if time.time() >= deadline:
+            log("  ✗ 所有备选选择器都未命中")
+            return None, None
+        time.sleep(0.25)
+
+    try:
+        el = WebDriverWait(driver, SELECTOR_PROBE_TIMEOUT).until(condition(rest[idx]))
+    except Exception as e:
+        log(f"  ✗ 探测命中但获取元素失败: {rest[idx][1]} {str(e)[:50]}")
+        return None, None
+    hit = ordered[start + idx]
+    SELECTOR_REGISTRY.record(group, hit)
+    log(f"  ✓ 命中选择器: {rest[idx][1]}")
+    return el, hit
+
+
 # ======== 点击时间选择器并选择日期 ========
 def select_date_by_click(driver, pub_date_str: str, debug_callback=None):
     """
@@ -131,10 +1311,14 @@ def select_date_by_click(driver, pub_date_str: str, debug_callback=None):
         wait = WebDriverWait(driver, 10)
         time.sleep(2)  # 额外等待页面完全加载
         
-        # 优先尝试下拉框 select#yearlist
+        # 优先尝试下拉框 select#yearlist；页面已加载完，找不到时只做短时探测，不等满 10 秒
         try:
             debug_print("尝试使用下拉框 #yearlist 选择年份...")
-            year_select_el = wait.until(EC.presence_of_element_located((By.ID, "yearlist")))
+            year_select_el, _ = find_by_selectors(
+                driver, "year_list", [(By.ID, "yearlist")], timeout=SELECTOR_PROBE_TIMEOUT, debug_print=debug_print
+            )
+            if year_select_el is None:
+                raise NoSuchElementException("找不到 #yearlist")
             sel = Select(year_select_el)
             sel.select_by_visible_text(f"{year}年")
             debug_print("✓ 使用 yearlist 成功选择年份")
@@ -144,34 +1328,22 @@ def select_date_by_click(driver, pub_date_str: str, debug_callback=None):
             # 退回到旧的泛化点击逻辑
             # 点击左侧时间选择框（常见的类名或id，可能需要根据实际页面调整）
             time_selectors = [
-                "//div[@class='time-select']",
-                "//div[contains(@class, 'time')]",
-                "//div[@id='timeSelect']",
-                "//span[contains(text(), '时间')]",
-                "//div[contains(@class, 'date')]",
-                "//input[@placeholder*='时间']",
-                "//input[@placeholder*='日期']",
-                "//div[contains(@class, 'left')]//div[contains(@class, 'time')]",
-                "//div[contains(@class, 'left')]//span[contains(text(), '时间')]",
-                "//div[contains(@class, 'filter')]//div[contains(@class, 'time')]",
+                (By.CSS_SELECTOR, "div.time-select"),
+                (By.CSS_SELECTOR, "div[class*='time']"),
+                (By.ID, "timeSelect"),
+                (By.XPATH, "//span[contains(text(), '时间')]"),
+                (By.CSS_SELECTOR, "div[class*='date']"),
+                (By.CSS_SELECTOR, "input[placeholder*='时间']"),
+                (By.CSS_SELECTOR, "input[placeholder*='日期']"),
+                (By.CSS_SELECTOR, "div[class*='left'] div[class*='time']"),
+                (By.XPATH, "//div[contains(@class, 'left')]//span[contains(text(), '时间')]"),
+                (By.CSS_SELECTOR, "div[class*='filter'] div[class*='time']"),
             ]
             
             debug_print(f"尝试查找时间选择器，共 {len(time_selectors)} 个选择器...")
-            time_element = None
-            found_selector = None
-            for i, selector in enumerate(time_selectors):
-                try:
-                    debug_print(f"  尝试选择器 {i+1}/{len(time_selectors)}: {selector}")
-                    time_element = wait.until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    if time_element:
-                        found_selector = selector
-                        debug_print(f"  ✓ 找到时间选择器！使用选择器: {selector}")
-                        break
-                except Exception as e2:
-                    debug_print(f"  ✗ 选择器失败: {str(e2)[:50]}")
-                    continue
+            time_element, found_selector = find_by_selectors(
+                driver, "time_selector", time_selectors, clickable=True, debug_print=debug_print
+            )
             
             if not time_element:
                 debug_print("✗ 所有时间选择器都失败，尝试查找页面所有可点击元素...")
@@ -204,27 +1376,26 @@ def select_date_by_click(driver, pub_date_str: str, debug_callback=None):
             # 选择年份（点击年份下拉或年份选择器）
             debug_print(f"开始选择年份: {year}")
             year_selectors = [
-                f"//span[text()='{year}']",
-                f"//li[text()='{year}']",
-                f"//div[text()='{year}']",
-                f"//a[text()='{year}']",
-                f"//span[contains(text(), '{year}')]",
-                f"//li[contains(text(), '{year}')]",
+                (By.XPATH, "//span[text()='{year}']"),
+                (By.XPATH, "//li[text()='{year}']"),
+                (By.XPATH, "//div[text()='{year}']"),
+                (By.XPATH, "//a[text()='{year}']"),
+                (By.XPATH, "//span[contains(text(), '{year}')]"),
+                (By.XPATH, "//li[contains(text(), '{year}')]"),
             ]
             
             year_found = False
-            for selector in year_selectors:
+            year_elem, _ = find_by_selectors(
+                driver, "year_selector", year_selectors, clickable=True, debug_print=debug_print, year=year
+            )
+            if year_elem:
                 try:
-                    debug_print(f"  尝试年份选择器: {selector}")
-                    year_elem = wait.until(EC.element_to_be_clickable((By.XPATH, selector)))
                     driver.execute_script("arguments[0].click();", year_elem)
                     debug_print(f"  ✓ 成功选择年份: {year}")
                     time.sleep(1)
                     year_found = True
-                    break
                 except Exception as e5:
-                    debug_print(f"  ✗ 年份选择器失败: {str(e5)[:50]}")
-                    continue
+                    debug_print(f"  ✗ 点击年份失败: {str(e5)[:50]}")
             
             if not year_found:
                 debug_print(f"✗ 无法选择年份: {year}")
@@ -235,10 +1406,16 @@ def select_date_by_click(driver, pub_date_str: str, debug_callback=None):
         month_text = f"{month}月"
 
         # 先尝试直接点日期（有时月份默认已展开，或页面已包含该日期）
+        # 月份通常是折叠的，直达多半找不到，只做短时探测
         debug_print(f"开始选择日期(直达): {pub_date_str}")
-        date_xpath_any = f"//dl[contains(@class,'jcsecondcol')]//a[normalize-space(text())='{pub_date_str}']"
+        date_xpath_any = "//dl[contains(@class,'jcsecondcol')]//a[normalize-space(text())='{date}']"
         try:
-            date_a = wait.until(EC.presence_of_element_located((By.XPATH, date_xpath_any)))
+            date_a, _ = find_by_selectors(
+                driver, "date_direct", [(By.XPATH, date_xpath_any)], timeout=SELECTOR_PROBE_TIMEOUT,
+                debug_print=debug_print, date=pub_date_str
+            )
+            if date_a is None:
+                raise NoSuchElementException(f"月份未展开，找不到日期 {pub_date_str}")
             driver.execute_script("arguments[0].scrollIntoView({block:'center'});", date_a)
             time.sleep(0.2)
             driver.execute_script("arguments[0].click();", date_a)
@@ -340,46 +1517,36 @@ def search_title(driver, title: str, debug_callback=None):
         
         debug_print(f"开始检索标题: {title[:50]}...")
         
-        wait = WebDriverWait(driver, 10)
         time.sleep(1)  # 等待页面稳定
         
         # 查找标题输入框（尝试多种可能的选择器）
         title_input_selectors = [
-            "//input[@placeholder*='题名']",
-            "//input[@placeholder*='标题']",
-            "//input[@placeholder*='关键词']",
-            "//input[@id*='title']",
-            "//input[@id*='keyword']",
-            "//input[@name*='title']",
-            "//input[@name*='keyword']",
-            "//input[@class*='search']",
-            "//textarea[@placeholder*='题名']",
-            "//input[@type='text']",
-            "//input",
+            (By.CSS_SELECTOR, "input[placeholder*='题名']"),
+            (By.CSS_SELECTOR, "input[placeholder*='标题']"),
+            (By.CSS_SELECTOR, "input[placeholder*='关键词']"),
+            (By.CSS_SELECTOR, "input[id*='title']"),
+            (By.CSS_SELECTOR, "input[id*='keyword']"),
+            (By.CSS_SELECTOR, "input[name*='title']"),
+            (By.CSS_SELECTOR, "input[name*='keyword']"),
+            (By.CSS_SELECTOR, "input[class*='search']"),
+            (By.CSS_SELECTOR, "textarea[placeholder*='题名']"),
+            (By.CSS_SELECTOR, "input[type='text']"),
+            (By.CSS_SELECTOR, "input"),
         ]
         
         debug_print(f"尝试查找标题输入框，共 {len(title_input_selectors)} 个选择器...")
-        title_input = None
-        found_selector = None
-        for i, selector in enumerate(title_input_selectors):
+        title_input, found_selector = find_by_selectors(
+            driver, "title_input", title_input_selectors, debug_print=debug_print
+        )
+        if title_input:
+            # 显示输入框信息
             try:
-                debug_print(f"  尝试选择器 {i+1}/{len(title_input_selectors)}: {selector}")
-                title_input = wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                if title_input:
-                    found_selector = selector
-                    debug_print(f"  ✓ 找到标题输入框！使用选择器: {selector}")
-                    # 显示输入框信息
-                    try:
-                        placeholder = title_input.get_attribute("placeholder") or ""
-                        input_id = title_input.get_attribute("id") or ""
-                        input_class = title_input.get_attribute("class") or ""
-                        debug_print(f"    输入框信息: placeholder={placeholder}, id={input_id}, class={input_class[:50]}")
-                    except:
-                        pass
-                    break
-            except Exception as e:
-                debug_print(f"  ✗ 选择器失败: {str(e)[:50]}")
-                continue
+                placeholder = title_input.get_attribute("placeholder") or ""
+                input_id = title_input.get_attribute("id") or ""
+                input_class = title_input.get_attribute("class") or ""
+                debug_print(f"    输入框信息: placeholder={placeholder}, id={input_id}, class={input_class[:50]}")
+            except:
+                pass
         
         if not title_input:
             debug_print("✗ 所有输入框选择器都失败，尝试查找页面所有input元素...")
@@ -414,29 +1581,21 @@ def search_title(driver, title: str, debug_callback=None):
         # 查找并点击检索按钮
         debug_print("查找检索按钮...")
         search_btn_selectors = [
-            "//button[contains(text(), '检索')]",
-            "//a[contains(text(), '检索')]",
-            "//input[@type='submit']",
-            "//button[@type='submit']",
-            "//div[contains(@class, 'search-btn')]",
-            "//span[contains(text(), '检索')]",
-            "//button[contains(@class, 'search')]",
-            "//a[contains(@class, 'search')]",
+            (By.XPATH, "//button[contains(text(), '检索')]"),
+            (By.XPATH, "//a[contains(text(), '检索')]"),
+            (By.CSS_SELECTOR, "input[type='submit']"),
+            (By.CSS_SELECTOR, "button[type='submit']"),
+            (By.CSS_SELECTOR, "div[class*='search-btn']"),
+            (By.XPATH, "//span[contains(text(), '检索')]"),
+            (By.CSS_SELECTOR, "button[class*='search']"),
+            (By.CSS_SELECTOR, "a[class*='search']"),
         ]
         
-        search_btn = None
-        found_btn_selector = None
-        for selector in search_btn_selectors:
-            try:
-                search_btn = driver.find_element(By.XPATH, selector)
-                if search_btn:
-                    found_btn_selector = selector
-                    debug_print(f"  ✓ 找到检索按钮！使用选择器: {selector}")
-                    break
-            except:
-                continue
-        
-        if search_btn:
+        search_btn, found_btn_selector = find_by_selectors(
+            driver, "search_button", search_btn_selectors, timeout=0, debug_print=debug_print
+        )
+        
+        if search_btn:
             try:
                 driver.execute_script("arguments[0].click();", search_btn)
                 debug_print("✓ 点击检索按钮成功")
@@ -470,126 +1629,305 @@ def search_title(driver, title: str, debug_callback=None):
         return False
 
 
+# ======== 结果列表抓包：从 performance 日志读取结果列表 XHR 响应 ========
+_GRID_NAME_CELL_RE = re.compile(r"<td[^>]*class=[\"'][^\"']*\bname\b[^\"']*[\"'][^>]*>(.*?)</td>", re.S | re.I)
+_GRID_LINK_RE = re.compile(r"<a\b[^>]*>(.*?)</a>", re.S | re.I)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_GRID_CURRENT_PAGE_RE = re.compile(r"id=[\"']partiallistcurrent[\"'][^>]*>\s*(\d+)", re.I)
+_GRID_TOTAL_PAGES_RE = re.compile(r"id=[\"']partiallistcount2[\"'][^>]*>\s*(\d+)", re.I)
+_GRID_PAGE_MARK_RE = re.compile(r"countPageMark[^>]*>\s*(\d+)\s*/\s*(\d+)", re.I)
+# 无结果时的页面片段特征
+_GRID_EMPTY_RE = re.compile(r"class=[\"'][^\"']*\bno-content\b|暂无数据", re.I)
+
+# 结果列表响应解析结果：规范化后的标题列表、当前页、总页数（页数取不到时为 None）
+ResultListPage = namedtuple("ResultListPage", ["titles", "current_page", "total_pages"])
+
+
+def parse_result_list(body: str):
+    """
+    解析结果列表接口返回的 HTML 片段（与页面 td.name a 相同的结构）
+    无法识别为结果列表（解析不出标题，又没有无结果标记）时返回 None，调用方应回退到 DOM 抓取
+    """
+    titles = []
+    for cell in _GRID_NAME_CELL_RE.findall(body):
+        link = _GRID_LINK_RE.search(cell)
+        text = normalize_title_strict(html.unescape(_HTML_TAG_RE.sub("", link.group(1) if link else cell)))
+        if text:
+            titles.append(text)
+    current_page = total_pages = None
+    m_cur = _GRID_CURRENT_PAGE_RE.search(body)
+    m_total = _GRID_TOTAL_PAGES_RE.search(body)
+    if m_cur and m_total:
+        current_page, total_pages = int(m_cur.group(1)), int(m_total.group(1))
+    else:
+        m = _GRID_PAGE_MARK_RE.search(body)
+        if m:
+            current_page, total_pages = int(m.group(1)), int(m.group(2))
+    if not titles:
+        # 有分页信息却解析不出标题，多半是列表结构变了，不能当作空页处理
+        if not _GRID_EMPTY_RE.search(body):
+            return None
+        current_page = total_pages = 1
+    return ResultListPage(titles, current_page, total_pages)
+
+
+def arm_result_capture(driver):
+    """
+    清空 performance 日志缓冲，之后触发的结果列表请求才会被 capture_result_list 读取
+    须在点击日期 / 下一页之前调用
+    """
+    if not CAPTURE_RESULTS_FROM_NETWORK:
+        return
+    try:
+        driver.get_log("performance")
+    except Exception as e:
+        print(f"[结果抓包] 读取 performance 日志失败：{e}")
+
+
+def _read_response_body(driver, request_id: str):
+    try:
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    except Exception as e:
+        print(f"[结果抓包] 读取响应正文失败：{e}")
+        return None
+    body = result.get("body", "")
+    if result.get("base64Encoded"):
+        body = base64.b64decode(body).decode("utf-8", errors="replace")
+    return body
+
+
+def capture_result_list(driver, timeout: float = RESULT_CAPTURE_TIMEOUT):
+    """
+    读取自上次 arm_result_capture 以来的结果列表响应，返回 ResultListPage；抓不到时返回 None
+    - URL 含 RESULT_LIST_URL_KEYWORDS 的 XHR/Fetch 请求为候选，等到候选全部结束后从最后发出的往前解析，
+      取第一个能识别为结果列表的响应（同一次操作可能触发多次请求，如先选年份再选日期）
+    - RESULT_CAPTURE_START_TIMEOUT 秒内没有发出任何候选请求时立即放弃，不白等 timeout
+    """
+    requests = []          # 按发出顺序排列的候选请求 requestId
+    done = set()           # 已结束（完成或失败）的请求
+    failed = set()
+    start = time.time()
+    deadline = start + timeout
+    while True:
+        try:
+            entries = driver.get_log("performance")
+        except Exception as e:
+            print(f"[结果抓包] 读取 performance 日志失败：{e}")
+            return None
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                url = params.get("request", {}).get("url", "")
+                if params.get("type") in ("XHR", "Fetch") and any(
+                    k.lower() in url.lower() for k in RESULT_LIST_URL_KEYWORDS
+                ):
+                    requests.append(params.get("requestId"))
+            elif method == "Network.loadingFinished":
+                done.add(params.get("requestId"))
+            elif method == "Network.loadingFailed":
+                done.add(params.get("requestId"))
+                failed.add(params.get("requestId"))
+        now = time.time()
+        if not requests and now - start >= RESULT_CAPTURE_START_TIMEOUT:
+            return None
+        if requests and (all(r in done for r in requests) or now >= deadline):
+            break
+        if now >= deadline:
+            return None
+        time.sleep(0.05)
+    for request_id in reversed(requests):
+        if request_id not in done or request_id in failed:
+            continue
+        body = _read_response_body(driver, request_id)
+        page = parse_result_list(body) if body else None
+        if page is not None:
+            return page
+    return None
+
+
 # ======== 在结果列表中查找完全匹配的标题（处理分页） ========
+class SearchIncomplete(Exception):
+    """结果列表没能查完（出错、翻页失败），found 为出错前已找到的标题；其余标题未能校验，不能当作“未找到”"""
+
+    def __init__(self, found: set, reason: str):
+        super().__init__(reason)
+        self.found = found
+
+
 def find_title_in_results(driver, title: str, max_pages: int = 50, debug_callback=None) -> bool:
     """
     在检索结果中查找完全匹配的标题，支持翻页
     返回 True 表示找到，False 表示未找到
     debug_callback: 用于输出调试信息的回调函数
     """
+    try:
+        found = find_titles_in_results(driver, [title], max_pages=max_pages, debug_callback=debug_callback)
+    except SearchIncomplete as e:
+        found = e.found
+    return normalize_title_strict(title) in found
+
+
+def find_titles_in_results(driver, titles, max_pages: int = 50, debug_callback=None) -> set:
+    """
+    在检索结果中同时查找多个标题（同一日期下的全部待查标题），支持翻页
+    每页只抓取/扫描一次，所有标题都找到后立即停止翻页
+    返回找到的标题集合（规范化后的文本）；中途出错没能查完时抛出 SearchIncomplete
+    debug_callback: 用于输出调试信息的回调函数
+    """
+    found = set()
     try:
         def debug_print(msg):
             print(f"[查找标题] {msg}")
             if debug_callback:
                 debug_callback(msg)
         
-        wait = WebDriverWait(driver, 10)
-        raw_title = title
-        title = normalize_title_strict(title)
-        debug_print(f"开始查找标题(规范化后): {title[:80]}...")
+        pending = {t for t in (normalize_title_strict(t) for t in titles) if t}
+        debug_print(f"开始查找 {len(pending)} 个标题(规范化后):")
+        for t in list(pending)[:5]:
+            debug_print(f"  - {t[:80]}...")
         debug_print(f"最多查找 {max_pages} 页")
         
+        def resolve(text, how):
+            if text in pending:
+                pending.discard(text)
+                found.add(text)
+                debug_print(f"  ✓✓✓ {how}找到完全匹配标题: {text[:50]}...")
+        
         current_page = 1
         
-        while current_page <= max_pages:
-            debug_print(f"\n--- 第 {current_page} 页 ---")
-            # 等待当前页结果加载
-            time.sleep(2)
+        while pending and current_page <= max_pages:
+            check_row_deadline()
+            debug_print(f"\n--- 第 {current_page} 页（待查 {len(pending)} 个标题）---")
             
-            # 显示当前页面信息
-            current_url = driver.current_url
-            page_title = driver.title
-            debug_print(f"当前页面URL: {current_url[:100]}...")
-            debug_print(f"当前页面标题: {page_title}")
+            # 方式0: 直接解析结果列表接口的响应，响应一到就匹配，不等渲染
+            captured = None
+            if CAPTURE_RESULTS_FROM_NETWORK:
+                captured = capture_result_list(driver)
+                if captured is None:
+                    debug_print("方式0: 未抓到可解析的结果列表响应，回退到页面抓取")
             
-            # 读取页面上的当前页和总页数信息（在循环开始时读取）
-            actual_current_page = current_page
-            actual_total_pages = max_pages
-            try:
-                current_page_elem = driver.find_element(By.ID, "partiallistcurrent")
-                total_pages_elem = driver.find_element(By.ID, "partiallistcount2")
-                actual_current_page = int(current_page_elem.text.strip())
-                actual_total_pages = int(total_pages_elem.text.strip())
-                debug_print(f"页面分页信息：当前页 {actual_current_page}/{actual_total_pages}")
+            found_before = len(found)
+            if captured is not None:
+                debug_print(f"方式0: 结果列表响应中有 {len(captured.titles)} 条标题")
+                actual_current_page = captured.current_page or current_page
+                actual_total_pages = captured.total_pages or max_pages
+                if captured.total_pages:
+                    debug_print(f"响应分页信息：当前页 {actual_current_page}/{actual_total_pages}")
+                for t in captured.titles:
+                    resolve(t, "结果列表响应中")
+                if not pending:
+                    return found
+                if len(found) == found_before and captured.titles:
+                    debug_print("方式0: 响应中没有命中任何待查标题，再用页面抓取核对一遍")
+            if captured is None or (len(found) == found_before and captured.titles):
+                # 等待当前页结果加载
+                time.sleep(2)
                 
-                # 如果已经超过总页数，停止
-                if actual_current_page > actual_total_pages:
-                    debug_print(f"  ✗ 当前页({actual_current_page})已超过总页数({actual_total_pages})，停止查找")
-                    break
-            except Exception as e:
-                debug_print(f"  ⚠ 无法读取页面分页信息: {e}，继续使用循环计数")
+                # 页面 URL、标题和分页信息一次往返读取
+                current_url, page_title, current_page_text, total_pages_text = execute_scripts(driver, [
+                    "return location.href;",
+                    "return document.title;",
+                    "var e = document.getElementById('partiallistcurrent'); return e ? e.innerText : null;",
+                    "var e = document.getElementById('partiallistcount2'); return e ? e.innerText : null;",
+                ])
+                debug_print(f"当前页面URL: {current_url[:100]}...")
+                debug_print(f"当前页面标题: {page_title}")
             
-            # 方式1: 使用结果列表结构化抓取（最可靠）
-            debug_print("方式1: 结构化抓取结果标题 td.name a ...")
-            try:
-                result_title_elems = driver.find_elements(By.XPATH, "//td[contains(@class,'name')]//a")
-                debug_print(f"  找到结果标题元素数量: {len(result_title_elems)}")
-
-                # 输出前5条用于调试
-                for i, el in enumerate(result_title_elems[:5]):
-                    t = normalize_title_strict(el.text)
-                    debug_print(f"    结果[{i+1}]: {t[:80]}")
-
-                for el in result_title_elems:
-                    t = normalize_title_strict(el.text)
-                    if t == title:
-                        debug_print("  ✓✓✓ 结构化列表中找到完全匹配标题！")
-                        return True
-            except Exception as e:
-                debug_print(f"  ✗ 结构化抓取失败: {e}")
-
-            # 方式2: 页面全文搜索（Ctrl+F 思路），但用规范化后再包含匹配
-            debug_print("方式2: 页面全文搜索（Ctrl+F方式，规范化后包含）...")
-            title_selectors = [
-                "//td[contains(@class,'name')]//a",
-                "//a[contains(@href, 'kcms2/article/abstract')]",
-                "//a",
-            ]
-            
-            title_elements = []
-            found_selector = None
-            for selector in title_selectors:
+                # 读取页面上的当前页和总页数信息（在循环开始时读取）
+                actual_current_page = current_page
+                actual_total_pages = max_pages
                 try:
-                    elements = driver.find_elements(By.XPATH, selector)
-                    if elements:
-                        title_elements = elements
-                        found_selector = selector
-                        debug_print(f"  ✓ 找到 {len(elements)} 个标题元素，使用选择器: {selector}")
+                    if current_page_text is None or total_pages_text is None:
+                        raise NoSuchElementException("找不到 #partiallistcurrent / #partiallistcount2")
+                    actual_current_page = int(current_page_text.strip())
+                    actual_total_pages = int(total_pages_text.strip())
+                    debug_print(f"页面分页信息：当前页 {actual_current_page}/{actual_total_pages}")
+                
+                    # 如果已经超过总页数，停止
+                    if actual_current_page > actual_total_pages:
+                        debug_print(f"  ✗ 当前页({actual_current_page})已超过总页数({actual_total_pages})，停止查找")
                         break
-                except:
-                    continue
+                except Exception as e:
+                    debug_print(f"  ⚠ 无法读取页面分页信息: {e}，继续使用循环计数")
             
-            if not title_elements:
-                debug_print("  ✗ 未找到任何标题元素")
-            else:
-                debug_print(f"  检查前 {min(10, len(title_elements))} 个标题元素...")
-                # 在当前页查找完全匹配的标题
-                for i, elem in enumerate(title_elements[:20]):  # 只检查前20个
-                    try:
-                        text = normalize_title_strict(elem.text)
-                        if text:
-                            if text == title:
-                                debug_print(f"  ✓✓✓ 在第 {i+1} 个元素中找到完全匹配的标题！")
-                                debug_print(f"    匹配的文本: {text[:50]}...")
-                                return True
-                            elif i < 5:  # 只显示前5个用于调试
-                                debug_print(f"    元素[{i+1}]: {text[:50]}...")
-                    except Exception as e:
-                        if i < 5:
-                            debug_print(f"    元素[{i+1}]获取文本失败: {e}")
+                # 方式1: 使用结果列表结构化抓取（最可靠）
+                debug_print("方式1: 结构化抓取结果标题 td.name a ...")
+                try:
+                    result_title_elems = driver.find_elements(By.XPATH, "//td[contains(@class,'name')]//a")
+                    debug_print(f"  找到结果标题元素数量: {len(result_title_elems)}")
 
-            # 方式3: 真正的 Ctrl+F（document.body.innerText），但先规范化
-            debug_print("方式3: document.body.innerText 规范化后包含匹配...")
-            try:
-                page_text = driver.execute_script("return document.body ? document.body.innerText : '';") or ""
-                page_norm = normalize_title_strict(page_text)
-                if title and title in page_norm:
-                    debug_print("  ✓ 在页面全文(规范化)中包含该标题")
-                    return True
+                    # 输出前5条用于调试
+                    for i, el in enumerate(result_title_elems[:5]):
+                        t = normalize_title_strict(el.text)
+                        debug_print(f"    结果[{i+1}]: {t[:80]}")
+
+                    for el in result_title_elems:
+                        resolve(normalize_title_strict(el.text), "结构化列表中")
+                        if not pending:
+                            return found
+                except Exception as e:
+                    debug_print(f"  ✗ 结构化抓取失败: {e}")
+
+                # 方式2: 页面全文搜索（Ctrl+F 思路），但用规范化后再包含匹配
+                debug_print("方式2: 页面全文搜索（Ctrl+F方式，规范化后包含）...")
+                title_selectors = [
+                    "//td[contains(@class,'name')]//a",
+                    "//a[contains(@href, 'kcms2/article/abstract')]",
+                    "//a",
+                ]
+            
+                title_elements = []
+                found_selector = None
+                for selector in title_selectors:
+                    try:
+                        elements = driver.find_elements(By.XPATH, selector)
+                        if elements:
+                            title_elements = elements
+                            found_selector = selector
+                            debug_print(f"  ✓ 找到 {len(elements)} 个标题元素，使用选择器: {selector}")
+                            break
+                    except:
+                        continue
+            
+                if not title_elements:
+                    debug_print("  ✗ 未找到任何标题元素")
                 else:
-                    debug_print("  ✗ 页面全文(规范化)不包含该标题")
-            except Exception as e:
-                debug_print(f"  ✗ 全文提取失败: {e}")
+                    debug_print(f"  检查前 {min(10, len(title_elements))} 个标题元素...")
+                    # 在当前页查找完全匹配的标题
+                    for i, elem in enumerate(title_elements[:20]):  # 只检查前20个
+                        try:
+                            text = normalize_title_strict(elem.text)
+                            if text:
+                                if text in pending:
+                                    resolve(text, f"在第 {i+1} 个元素中")
+                                    if not pending:
+                                        return found
+                                elif i < 5:  # 只显示前5个用于调试
+                                    debug_print(f"    元素[{i+1}]: {text[:50]}...")
+                        except Exception as e:
+                            if i < 5:
+                                debug_print(f"    元素[{i+1}]获取文本失败: {e}")
+
+                # 方式3: 真正的 Ctrl+F（document.body.innerText），但先规范化
+                # 对所有待查标题建一个 Aho-Corasick 自动机，整页文本只线性扫描一遍
+                debug_print("方式3: document.body.innerText 规范化后多标题包含匹配...")
+                try:
+                    page_text = driver.execute_script("return document.body ? document.body.innerText : '';") or ""
+                    page_norm = normalize_title_strict(page_text)
+                    hits = TitleMatcher(pending).find_all(page_norm)
+                    for t in hits:
+                        resolve(t, "页面全文(规范化)中")
+                    if not pending:
+                        return found
+                    if not hits:
+                        debug_print("  ✗ 页面全文(规范化)不包含任何待查标题")
+                except Exception as e:
+                    debug_print(f"  ✗ 全文提取失败: {e}")
             
             # 如果当前页没找到，尝试翻到下一页
             # 使用实际读取的页面信息来判断
@@ -597,35 +1935,31 @@ def find_title_in_results(driver, title: str, max_pages: int = 50, debug_callbac
                 debug_print(f"当前页未找到，尝试翻到第 {current_page + 1} 页...")
                 # 查找"下一页"按钮（使用正确的选择器）
                 next_btn_selectors = [
-                    "//a[@class='page-next']",  # 优先使用这个
-                    "//a[contains(@class, 'page-next')]",
-                    "//a[contains(text(), '下一页')]",
-                    "//a[contains(text(), '下页')]",
-                    "//a[contains(@class, 'next')]",
+                    (By.CSS_SELECTOR, "a[class='page-next']"),  # 优先使用这个
+                    (By.CSS_SELECTOR, "a[class*='page-next']"),
+                    (By.XPATH, "//a[contains(text(), '下一页')]"),
+                    (By.XPATH, "//a[contains(text(), '下页')]"),
+                    (By.CSS_SELECTOR, "a[class*='next']"),
                 ]
                 
-                next_btn = None
-                found_next_selector = None
-                for selector in next_btn_selectors:
-                    try:
-                        next_btn = driver.find_element(By.XPATH, selector)
-                        if next_btn:
-                            # 检查是否有disable类（注意：是disable不是disabled）
-                            classes = next_btn.get_attribute("class") or ""
-                            if "disable" not in classes.lower() and "disabled" not in classes.lower():
-                                found_next_selector = selector
-                                debug_print(f"  ✓ 找到下一页按钮，使用选择器: {selector}")
-                                debug_print(f"    按钮class: {classes}")
-                                break
-                    except Exception as e:
-                        debug_print(f"  ✗ 选择器 {selector} 失败: {str(e)[:50]}")
-                        continue
+                # 跳过带 disable 类的按钮（注意：是disable不是disabled，正则同时覆盖两者）
+                # 抓包模式下响应到达时页面可能还没渲染出翻页按钮，稍等片刻
+                next_btn, found_next_selector = find_by_selectors(
+                    driver, "next_page", next_btn_selectors, timeout=5 if captured is not None else 0,
+                    reject_class="disable", debug_print=debug_print
+                )
+                if next_btn:
+                    debug_print(f"    按钮class: {next_btn.get_attribute('class') or ''}")
                 
                 if next_btn and found_next_selector:
                     try:
+                        arm_result_capture(driver)
                         driver.execute_script("arguments[0].click();", next_btn)
                         current_page += 1
                         debug_print(f"  ✓ 已点击下一页，等待加载...")
+                        if CAPTURE_RESULTS_FROM_NETWORK:
+                            # 下一页的结果列表响应由方式0等待，无需固定等待渲染
+                            continue
                         time.sleep(3)  # 等待下一页加载
                         # 重新读取页面信息以确认翻页成功
                         try:
@@ -637,7 +1971,7 @@ def find_title_in_results(driver, title: str, max_pages: int = 50, debug_callbac
                         continue
                     except Exception as e:
                         debug_print(f"  ✗ 点击下一页按钮失败: {e}")
-                        break
+                        raise SearchIncomplete(found, f"点击下一页按钮失败：{e}")
                 else:
                     debug_print("  ✗ 未找到可用的下一页按钮（可能已禁用或不存在），已到最后一页")
                     break
@@ -647,9 +1981,12 @@ def find_title_in_results(driver, title: str, max_pages: int = 50, debug_callbac
             
             current_page += 1
         
-        debug_print(f"\n✗✗✗ 在所有 {current_page-1} 页中都未找到完全匹配的标题")
-        return False
+        if pending:
+            debug_print(f"\n✗✗✗ 在所有 {current_page-1} 页中仍有 {len(pending)} 个标题未找到完全匹配")
+        return found
         
+    except SearchIncomplete:
+        raise
     except Exception as e:
         error_msg = f"查找标题时出错：{e}"
         print(f"[查找标题] {error_msg}")
@@ -657,16 +1994,59 @@ def find_title_in_results(driver, title: str, max_pages: int = 50, debug_callbac
             debug_callback(error_msg)
         import traceback
         print(traceback.format_exc())
-        return False
+        raise SearchIncomplete(found, error_msg) from e
 
 
 # ======== 检查单行：按日期+标题在知网页面检索并校验 ========
-def check_title_at_date(driver, pub_date_str: str, title: str, debug_callback=None) -> bool:
+def check_title_at_date(driver, pub_date_str: str, title: str, debug_callback=None):
     """
     检查在给定日期下是否能找到完全相同的标题
-    返回 True 表示能找到，False 表示未找到
+    返回 True 表示能找到，False 表示未找到，None 表示未能校验（页面打不开、日期选不上、查找中途出错）
+    debug_callback: 用于输出调试信息的回调函数
+    """
+    return check_titles_at_date(driver, pub_date_str, [title], debug_callback=debug_callback)[title]
+
+
+def prepare_date_page(driver, pub_date_str: str, debug_callback=None) -> bool:
+    """
+    打开检索页面并选择日期（check_titles_at_date 的步骤1、2，也用于预取下一个日期）
+    返回 True 表示结果列表已按该日期筛选好
+    """
+    def debug_print(msg):
+        print(f"[检查标题] {msg}")
+        if debug_callback:
+            debug_callback(msg)
+    
+    # 打开检索页面
+    debug_print("步骤1: 打开检索页面...")
+    ok = open_page_with_retry(driver, BASE_SEARCH_URL)
+    if not ok:
+        debug_print("✗ 页面多次重试仍失败，跳过该行")
+        return False
+    debug_print("✓ 页面打开成功")
+    time.sleep(2)
+    
+    # 1. 点击时间选择器并选择日期（之后触发的结果列表请求由 capture_result_list 读取）
+    check_row_deadline()
+    debug_print("\n步骤2: 选择日期...")
+    arm_result_capture(driver)
+    if not select_date_by_click(driver, pub_date_str, debug_callback):
+        debug_print(f"✗ 无法选择日期：{pub_date_str}")
+        return False
+    debug_print("✓ 日期选择完成")
+    return True
+
+
+def check_titles_at_date(driver, pub_date_str: str, titles, debug_callback=None, date_ready: bool = False) -> dict:
+    """
+    检查在给定日期下能否找到这些标题（同一日期的多行只打开/选择日期一次）
+    返回 {标题: True/False/None}，键为传入的原始标题；None 表示未能校验
+    （页面打不开、日期选不上、查找中途出错），调用方不能把它当作不匹配，也不应记入增量校验历史
     debug_callback: 用于输出调试信息的回调函数
+    date_ready: 页面已由预取会话打开并选好该日期时为 True，跳过步骤1、2
     """
+    titles = list(titles)
+    results = {t: None for t in titles}
     try:
         def debug_print(msg):
             print(f"[检查标题] {msg}")
@@ -674,42 +2054,45 @@ def check_title_at_date(driver, pub_date_str: str, title: str, debug_callback=No
                 debug_callback(msg)
         
         debug_print("="*60)
-        debug_print(f"开始检查：日期={pub_date_str}, 标题={title[:50]}...")
+        if len(titles) == 1:
+            debug_print(f"开始检查：日期={pub_date_str}, 标题={titles[0][:50]}...")
+        else:
+            debug_print(f"开始检查：日期={pub_date_str}, 共 {len(titles)} 个标题")
         debug_print("="*60)
         
-        # 打开检索页面
-        debug_print("步骤1: 打开检索页面...")
-        ok = open_page_with_retry(driver, BASE_SEARCH_URL)
-        if not ok:
-            debug_print("✗ 页面多次重试仍失败，跳过该行")
-            return False
-        debug_print("✓ 页面打开成功")
-        time.sleep(2)
-        
-        # 1. 点击时间选择器并选择日期
-        debug_print("\n步骤2: 选择日期...")
-        if not select_date_by_click(driver, pub_date_str, debug_callback):
-            debug_print(f"✗ 无法选择日期：{pub_date_str}")
-            return False
-        debug_print("✓ 日期选择完成")
+        if date_ready:
+            debug_print("步骤1、2: 页面已预取并选好日期，直接查找")
+        elif not prepare_date_page(driver, pub_date_str, debug_callback):
+            return results
         
         # 2. 不再输入标题检索（容易误点到登录框/被遮罩），改为按日期筛选后直接在结果列表分页查找
         debug_print("\n步骤3: 跳过输入框检索（按日期筛选后直接分页查找标题）...")
 
-        # 3. 在结果列表中查找完全匹配的标题（处理分页）
+        # 3. 在结果列表中查找完全匹配的标题（处理分页，多个标题共用同一次翻页）
         debug_print("\n步骤4: 在结果中查找标题（分页 + Ctrl+F思路）...")
-        found = find_title_in_results(driver, title, debug_callback=debug_callback)
+        try:
+            found = find_titles_in_results(driver, titles, debug_callback=debug_callback)
+        except SearchIncomplete as e:
+            # 已找到的标题是确定的结论，其余标题未能校验
+            debug_print(f"⚠ 结果列表没能查完（{e}），未找到的标题记为未能校验")
+            for t in titles:
+                if normalize_title_strict(t) in e.found:
+                    results[t] = True
+            return results
+        for t in titles:
+            results[t] = normalize_title_strict(t) in found
         
-        if found:
-            debug_print("\n" + "="*60)
+        n_found = sum(results.values())
+        debug_print("\n" + "="*60)
+        if n_found == len(titles):
             debug_print("✓✓✓ 检查结果：找到匹配的标题！")
-            debug_print("="*60)
+        elif n_found:
+            debug_print(f"⚠ 检查结果：{n_found}/{len(titles)} 个标题找到匹配")
         else:
-            debug_print("\n" + "="*60)
             debug_print("✗✗✗ 检查结果：未找到匹配的标题")
-            debug_print("="*60)
+        debug_print("="*60)
         
-        return found
+        return results
         
     except Exception as e:
         error_msg = f"检查标题时出错：{e}"
@@ -718,7 +2101,618 @@ def check_title_at_date(driver, pub_date_str: str, title: str, debug_callback=No
             debug_callback(error_msg)
         import traceback
         print(traceback.format_exc())
-        return False
+        return results
+
+
+# ======== 浏览器会话守护：健康检查 + 按行数/内存回收 ========
+def _process_tree(root_pid: int):
+    """返回 root_pid 及其全部子进程的 {pid: 常驻内存KB}，取不到时返回 None（依赖 ps，适用于 macOS/Linux）"""
+    try:
+        out = subprocess.run(
+            ["ps", "-A", "-o", "pid=,ppid=,rss="], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    children = {}
+    rss_kb = {}
+    for line in out.splitlines():
+        try:
+            pid, ppid, kb = (int(x) for x in line.split())
+        except ValueError:
+            continue
+        children.setdefault(ppid, []).append(pid)
+        rss_kb[pid] = kb
+    if root_pid not in rss_kb:
+        return None
+    tree = {}
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree[pid] = rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def _process_tree_rss_mb(root_pid: int):
+    """统计 root_pid 及其全部子进程的常驻内存（MB），取不到时返回 None"""
+    tree = _process_tree(root_pid)
+    if tree is None:
+        return None
+    return sum(tree.values()) / 1024
+
+
+class RowTimeout(Exception):
+    """任务超过 ROW_TIME_BUDGET 被看门狗中止，调用方应把这些行记为“超时，稍后重试”"""
+
+
+class SessionCrashed(Exception):
+    """浏览器会话在任务中崩溃，重建重试 SESSION_CRASH_RETRIES 次仍失败；这些行未能校验，不能当作不匹配"""
+
+
+# 当前线程正在执行的任务的看门狗，供 check_row_deadline 在长循环中检查
+_row_deadline = threading.local()
+
+
+def check_row_deadline():
+    """在翻页、重试等长循环中调用：当前任务已超出时间预算时抛出 RowTimeout"""
+    watchdog = getattr(_row_deadline, "watchdog", None)
+    if watchdog is not None and watchdog.expired.is_set():
+        raise RowTimeout(f"超过时间预算 {watchdog.budget} 秒")
+
+
+class RowWatchdog(threading.Thread):
+    """
+    任务看门狗：超过 budget 秒后置 expired 标志（check_row_deadline 据此中止任务），
+    再过 grace 秒任务仍未返回（通常卡在 driver.get 或某条 WebDriver 命令上），
+    则强制结束 chromedriver 及 Chrome，使阻塞中的命令立即失败
+    """
+
+    def __init__(self, supervisor, budget: float, grace: float):
+        super().__init__(daemon=True)
+        self.supervisor = supervisor
+        self.budget = budget
+        self.grace = grace
+        self.expired = threading.Event()
+        self.killed = False
+        self._done = threading.Event()
+
+    def run(self):
+        if self._done.wait(self.budget):
+            return
+        self.expired.set()
+        # 不在看门狗线程里调用 debug_callback：Tk 控件只能在主线程操作
+        print(f"[看门狗] 任务超过时间预算 {self.budget} 秒，等待当前命令返回...")
+        if self._done.wait(self.grace):
+            return
+        print(f"[看门狗] {self.grace} 秒后仍未返回，强制结束浏览器")
+        self.killed = True
+        self.supervisor.kill()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class DriverSupervisor:
+    """
+    管理浏览器会话的生命周期，process_excel 通过它使用 driver：
+    - 每个任务执行前，处理行数超过 RECYCLE_AFTER_ROWS 或 Chrome 内存超过 RECYCLE_MAX_RSS_MB 时重建会话
+    - 任务执行后用一次廉价的 execute_script 做健康检查，会话已崩溃则重建并重试该任务
+    - 每个任务受 ROW_TIME_BUDGET 看门狗约束，超时抛出 RowTimeout（必要时先强制结束并重建浏览器）
+    - 响应录制/回放随会话一起挂载和卸载
+    """
+
+    def __init__(self, factory=None, recycle_after_rows: int = None, max_rss_mb: float = None,
+                 debug_callback=None, row_time_budget: float = None):
+        self.factory = factory or make_browser
+        self.recycle_after_rows = RECYCLE_AFTER_ROWS if recycle_after_rows is None else recycle_after_rows
+        self.max_rss_mb = RECYCLE_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.row_time_budget = ROW_TIME_BUDGET if row_time_budget is None else row_time_budget
+        self.debug_callback = debug_callback
+        self.driver = None
+        self.response_cache = None
+        self.rows_served = 0
+        self.tasks_served = 0
+        self.sessions_started = 0
+        # 当前页面已选好的日期（由 DatePrefetcher 预取时设置），会话重建后失效
+        self.prepared_date = None
+
+    def debug_print(self, msg):
+        print(f"[会话守护] {msg}")
+        if self.debug_callback:
+            self.debug_callback(msg)
+
+    def start(self):
+        self.driver = self.factory()
+        if self.row_time_budget:
+            # 页面加载最多等到时间预算用完，卡住的 driver.get 会先由 chromedriver 自行中止
+            try:
+                self.driver.set_page_load_timeout(self.row_time_budget)
+            except Exception as e:
+                print(f"[会话守护] 设置页面加载超时失败：{e}")
+        # 按 CACHE_MODE 启用响应录制/回放（默认关闭）
+        self.response_cache = attach_response_cache(self.driver)
+        self.rows_served = 0
+        self.tasks_served = 0
+        self.sessions_started += 1
+        self.prepared_date = None
+        return self.driver
+
+    def stop(self):
+        if self.response_cache:
+            self.response_cache.stop()
+            self.response_cache = None
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"[会话守护] 关闭浏览器失败：{e}")
+            self.driver = None
+
+    def recycle(self, reason: str):
+        self.debug_print(f"重建浏览器会话：{reason}")
+        self.stop()
+        return self.start()
+
+    def is_healthy(self) -> bool:
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def kill(self):
+        """强制结束 chromedriver 及其启动的 Chrome 进程（看门狗在命令长时间无响应时调用）"""
+        try:
+            process = self.driver.service.process
+        except Exception:
+            return
+        tree = _process_tree(process.pid)
+        if tree is None:
+            process.kill()
+            return
+        for pid in tree:
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+
+    def chrome_rss_mb(self):
+        try:
+            pid = self.driver.service.process.pid
+        except Exception:
+            return None
+        return _process_tree_rss_mb(pid)
+
+    def _maybe_recycle(self):
+        if self.recycle_after_rows and self.rows_served >= self.recycle_after_rows:
+            self.recycle(f"已处理 {self.rows_served} 行（{self.tasks_served} 个任务）")
+            return
+        if self.max_rss_mb:
+            rss = self.chrome_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                self.recycle(f"Chrome 内存 {rss:.0f} MB 超过阈值 {self.max_rss_mb} MB")
+
+    def run(self, rows: int, fn, *args, **kwargs):
+        """
+        在当前会话上执行 fn(driver, *args, **kwargs)，rows 为该任务包含的 Excel 行数
+        会话在任务中崩溃时重建并重试，最多 SESSION_CRASH_RETRIES 次
+        任务超过 row_time_budget 秒时抛出 RowTimeout，不在此处重试；重试用完仍崩溃时抛出 SessionCrashed
+        """
+        if self.driver is None:
+            self.start()
+        else:
+            self._maybe_recycle()
+        attempt = 0
+        while True:
+            error = None
+            result = None
+            watchdog = None
+            if self.row_time_budget:
+                watchdog = RowWatchdog(self, self.row_time_budget, ROW_TIMEOUT_GRACE)
+                _row_deadline.watchdog = watchdog
+                watchdog.start()
+            try:
+                result = fn(self.driver, *args, **kwargs)
+            except Exception as e:
+                error = e
+            finally:
+                if watchdog is not None:
+                    watchdog.stop()
+                    _row_deadline.watchdog = None
+            self.tasks_served += 1
+            if watchdog is not None and watchdog.expired.is_set():
+                # 超时任务的结果不完整（查找函数会吞掉异常并返回部分结果），一律按超时处理
+                if watchdog.killed or not self.is_healthy():
+                    self.recycle("任务超时，浏览器已被强制结束")
+                raise RowTimeout(f"超过时间预算 {self.row_time_budget} 秒") from error
+            if self.is_healthy():
+                if error is not None:
+                    raise error
+                self.rows_served += rows
+                return result
+            if attempt >= SESSION_CRASH_RETRIES:
+                # 崩溃会话上的结果是吞掉异常后的全 False，不能当作结论返回
+                self.recycle("会话无响应，重试次数已用完")
+                raise SessionCrashed(f"浏览器会话崩溃，重建后重试 {attempt} 次仍失败") from error
+            attempt += 1
+            self.recycle(f"会话无响应，重建后重试该任务（第 {attempt} 次）")
+
+
+class DatePrefetcher:
+    """
+    日期预取流水线（PREFETCH_NEXT_DATE）：两个浏览器会话轮流使用
+    - 当前会话扫描本日期的结果列表时，备用会话在后台线程中打开页面并选好下一个日期
+    - 轮到该日期时直接交换两个会话，跳过打开页面和选择日期
+    - 预取的日期与实际要检查的日期不一致（日程变化）或预取失败时丢弃，按常规流程处理
+    用两个会话而不是同一会话的两个标签页：同一会话的命令是串行执行的，无法与当前日期的扫描并行
+    """
+
+    def __init__(self, supervisor: DriverSupervisor):
+        self.active = supervisor
+        self.spare = DriverSupervisor(factory=supervisor.factory)
+        self._thread = None
+        self._pending_date = None
+
+    def _prefetch(self, pub_date_str: str):
+        def prepare(driver):
+            # 后台线程不能操作 Tk 控件，调试信息只打印到控制台
+            if prepare_date_page(driver, pub_date_str):
+                self.spare.prepared_date = pub_date_str
+        try:
+            self.spare.run(0, prepare)
+        except Exception as e:
+            print(f"[预取] 预取日期 {pub_date_str} 失败：{e}")
+
+    def _start_prefetch(self, pub_date_str: str):
+        self.spare.prepared_date = None
+        self._pending_date = pub_date_str
+        self._thread = threading.Thread(target=self._prefetch, args=(pub_date_str,), daemon=True)
+        self._thread.start()
+
+    def _join(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self, rows: int, pub_date_str: str, titles, next_date: str = None, debug_callback=None) -> dict:
+        """
+        检查 pub_date_str 下的 titles（同 check_titles_at_date），同时在备用会话中预取 next_date
+        """
+        self._join()
+        if self._pending_date is not None:
+            if self.spare.prepared_date == pub_date_str:
+                self.active, self.spare = self.spare, self.active
+                self.active.debug_callback, self.spare.debug_callback = self.spare.debug_callback, None
+            else:
+                self.active.debug_print(f"预取的日期 {self._pending_date} 与当前日期 {pub_date_str} 不一致或未就绪，丢弃预取")
+                self.spare.prepared_date = None
+            self._pending_date = None
+        if next_date is not None and next_date != pub_date_str:
+            self._start_prefetch(next_date)
+
+        active = self.active
+
+        def task(driver):
+            date_ready = active.prepared_date == pub_date_str
+            active.prepared_date = None
+            return check_titles_at_date(driver, pub_date_str, titles, debug_callback=debug_callback,
+                                        date_ready=date_ready)
+
+        return active.run(rows, task)
+
+    def stop(self):
+        self._join()
+        self._pending_date = None
+        self.spare.stop()
+
+
+# ======== 增量校验：记录每行的 (日期, 规范化标题) 指纹与结论，重跑时只校验新增/改动的行 ========
+class VerifyHistory:
+    """
+    按工作簿（文件名）保存已校验行的指纹和结论（SQLite，VERIFY_HISTORY_DB）
+    指纹相同即视为未改动，直接沿用上次结论；行号变化（插入/删除行）不影响匹配
+    """
+
+    def __init__(self, path: str = VERIFY_HISTORY_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    workbook TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    pub_date TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    found INTEGER NOT NULL,
+                    checked_at REAL NOT NULL,
+                    PRIMARY KEY (workbook, fingerprint)
+                )
+                """
+            )
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def workbook_key(filepath: str) -> str:
+        return os.path.basename(filepath).lower()
+
+    @staticmethod
+    def fingerprint(pub_date_str: str, title: str) -> str:
+        return hashlib.sha1(f"{pub_date_str}\x1f{title}".encode("utf-8")).hexdigest()
+
+    def split(self, workbook: str, tasks):
+        """
+        把预处理得到的 tasks 分成 (仍需浏览器校验的 tasks, 沿用的结论 {Excel行号: True/False})
+        """
+        known = dict(self._conn.execute(
+            "SELECT fingerprint, found FROM verdicts WHERE workbook = ?", (workbook,)
+        ).fetchall())
+        todo = []
+        carried = {}
+        for task in tasks:
+            found = known.get(self.fingerprint(task.date, task.title))
+            if found is None:
+                todo.append(task)
+            else:
+                carried[task.row] = bool(found)
+        return todo, carried
+
+    def record(self, workbook: str, verdicts):
+        """verdicts: [(日期, 规范化标题, True/False), ...]"""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO verdicts (workbook, fingerprint, pub_date, title, found, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(workbook, self.fingerprint(d, t), d, t, int(bool(ok)), now) for d, t, ok in verdicts],
+            )
+
+
+# ======== 离线目录：导入知网题录导出文件，按 标题 -> 发表日期 本地判定 ========
+# 题录中精确到日的日期，如 2019-12-31、2019/12/31 08:00、2019年12月31日、20191231
+# 带分隔符时月、日可为 1~2 位，不带分隔符时必须是 8 位数字；前后不能紧跟数字，
+# 避免把 2019-12、2019年12月 之类只有年月的日期拆成 2019-1-2
+_EXPORT_DATE_RE = re.compile(
+    r"(?<!\d)(\d{4})(?:\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})|(\d{2})(\d{2}))(?!\d)"
+)
+# 标签式题录的字段：RefWorks 为 "T1 标题"，EndNote 为 "%T 标题"，NoteExpress 为 "{Title}: 标题"
+_REFWORKS_LINE_RE = re.compile(r"^([A-Za-z][A-Za-z0-9])\s(.*)$")
+_ENDNOTE_LINE_RE = re.compile(r"^(%[0-9A-Za-z@!#$&()*+^|~<>?])\s*(.*)$")
+_NOTEEXPRESS_LINE_RE = re.compile(r"^\{([^}]+)\}:\s*(.*)$")
+
+# 各格式中表示“新记录开始”、标题、完整发表日期的字段（按优先级排列）
+_TAGGED_EXPORT_FORMATS = {
+    "refworks": (_REFWORKS_LINE_RE, "RT", ("T1",), ("FD", "PD")),
+    "endnote": (_ENDNOTE_LINE_RE, "%0", ("%T",), ("%8",)),
+    "noteexpress": (_NOTEEXPRESS_LINE_RE, "Reference Type", ("Title",),
+                    ("Date", "Publication Date", "Issue Date", "发表时间")),
+}
+# CSV / Excel 导出中可作为标题列、日期列的列名关键字（知网“自定义”导出的列名如 Title-题名、PubTime-发表时间）
+_CATALOG_TITLE_KEYS = ("Title", "题名", "标题")
+_CATALOG_DATE_KEYS = ("PubTime", "PubDate", "发表时间", "出版日期", "发布时间", "Date", "日期")
+
+
+def parse_export_date(text):
+    """把题录中的日期文本解析为 YYYY-MM-DD；只有年份、只有年月或无法解析时返回 None"""
+    if text is None:
+        return None
+    m = _EXPORT_DATE_RE.search(str(text))
+    if not m:
+        return None
+    year, month, day = m.group(1), m.group(2) or m.group(4), m.group(3) or m.group(5)
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _read_export_text(path: str) -> str:
+    """知网导出文件可能是 UTF-8（带或不带 BOM）或 GBK 编码"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    for encoding in ("utf-8-sig", "gb18030"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+def _parse_tagged_export(text: str, fmt: str):
+    """解析 RefWorks / EndNote / NoteExpress 标签式题录，返回 [(标题, 日期或 None), ...]"""
+    line_re, start_tag, title_tags, date_tags = _TAGGED_EXPORT_FORMATS[fmt]
+    records = []
+    fields = {}
+
+    def flush():
+        title = next((fields[t] for t in title_tags if fields.get(t)), "")
+        if title:
+            date = None
+            for tag in date_tags:
+                date = parse_export_date(fields.get(tag))
+                if date:
+                    break
+            records.append((title, date))
+        fields.clear()
+
+    for line in text.splitlines():
+        m = line_re.match(line.strip())
+        if not m:
+            continue
+        tag, value = m.group(1), m.group(2).strip()
+        if tag == start_tag and fields:
+            flush()
+        # 同一字段出现多次（如多位作者）时只保留第一次
+        fields.setdefault(tag, value)
+    if fields:
+        flush()
+    return records
+
+
+def _parse_table_export(df: pd.DataFrame):
+    """解析 CSV / Excel 题录，按列名关键字找标题列和日期列，返回 [(标题, 日期或 None), ...]"""
+    def pick(keys):
+        for key in keys:
+            for col in df.columns:
+                if key.lower() in str(col).lower():
+                    return col
+        return None
+
+    title_col = pick(_CATALOG_TITLE_KEYS)
+    date_col = pick(_CATALOG_DATE_KEYS)
+    if title_col is None or date_col is None:
+        raise ValueError(f"题录表格中找不到标题列或发表时间列：{list(df.columns)}")
+    return [
+        (title, parse_export_date(date))
+        for title, date in zip(df[title_col], df[date_col])
+        if isinstance(title, str) and title.strip()
+    ]
+
+
+def parse_cnki_export(path: str):
+    """
+    解析知网导出的题录文件，返回 [(标题, YYYY-MM-DD 或 None), ...]
+    支持 CSV、Excel（.xls/.xlsx）以及 RefWorks、EndNote、NoteExpress 文本格式（按内容识别）
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xls", ".xlsx", ".xlsm"):
+        return _parse_table_export(pd.read_excel(path, dtype=str))
+    text = _read_export_text(path)
+    head = text.lstrip()[:200]
+    if head.startswith("{"):
+        return _parse_tagged_export(text, "noteexpress")
+    if head.startswith("%0"):
+        return _parse_tagged_export(text, "endnote")
+    if head.startswith("RT "):
+        return _parse_tagged_export(text, "refworks")
+    return _parse_table_export(pd.read_csv(io.StringIO(text), dtype=str, sep=None, engine="python"))
+
+
+class CatalogIndex:
+    """
+    标题 -> 发表日期 的离线目录（SQLite，CATALOG_DB），标题按 normalize_title_strict 规范化后建索引
+    同一标题可对应多个日期（如不同期次重复刊登），日期只收录精确到日的记录
+    另记录每个题录文件覆盖的年份（文件中最早到最晚日期之间的各年），知网导出按刊按年，
+    只有日期落在已导入年份内的行才由目录判定，其余行（如跨年重复的“卷首语”）仍交给浏览器
+    """
+
+    def __init__(self, path: str = CATALOG_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        with self._conn:
+            # 旧版目录的主键不含 source，一个文件的导入会覆盖另一个文件的同名同日期记录，重建为新结构
+            columns = {name: pk for _, name, _, _, _, pk in self._conn.execute("PRAGMA table_info(catalog)")}
+            if columns and not columns.get("source"):
+                self._conn.execute("ALTER TABLE catalog RENAME TO catalog_old")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS catalog (
+                    title TEXT NOT NULL,
+                    pub_date TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    PRIMARY KEY (title, pub_date, source)
+                )
+                """
+            )
+            if columns and not columns.get("source"):
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO catalog (title, pub_date, source) "
+                    "SELECT title, pub_date, source FROM catalog_old"
+                )
+                self._conn.execute("DROP TABLE catalog_old")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS coverage (
+                    source TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    PRIMARY KEY (source, year)
+                )
+                """
+            )
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def exists(path: str = CATALOG_DB) -> bool:
+        return os.path.exists(path)
+
+    def import_file(self, path: str):
+        """导入一个题录文件，返回 (记录数, 收录的带完整日期的记录数)"""
+        records = parse_cnki_export(path)
+        source = os.path.basename(path)
+        rows = [(normalize_title_strict(title), date, source) for title, date in records if date]
+        years = [int(date[:4]) for _, date, _ in rows]
+        with self._conn:
+            # 同名文件重新导入时以新文件的记录和覆盖范围为准，其他文件的记录不受影响
+            self._conn.execute("DELETE FROM catalog WHERE source = ?", (source,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO catalog (title, pub_date, source) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute("DELETE FROM coverage WHERE source = ?", (source,))
+            if years:
+                self._conn.executemany(
+                    "INSERT INTO coverage (source, year) VALUES (?, ?)",
+                    [(source, y) for y in range(min(years), max(years) + 1)],
+                )
+        return len(records), len(rows)
+
+    def covered_years(self) -> set:
+        return {y for (y,) in self._conn.execute("SELECT DISTINCT year FROM coverage")}
+
+    def size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM (SELECT DISTINCT title, pub_date FROM catalog)").fetchone()[0]
+
+    def lookup(self, titles) -> dict:
+        """返回 {规范化标题: {日期, ...}}，只包含目录中有记录的标题"""
+        dates = {}
+        titles = list(dict.fromkeys(titles))
+        # 分批查询，避免超过 SQLite 单条语句的参数个数上限
+        for i in range(0, len(titles), 500):
+            batch = titles[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            for title, pub_date in self._conn.execute(
+                f"SELECT title, pub_date FROM catalog WHERE title IN ({marks})", batch
+            ):
+                dates.setdefault(title, set()).add(pub_date)
+        return dates
+
+    def split(self, tasks):
+        """
+        把 tasks 分成 (目录未覆盖、仍需浏览器校验的 tasks, 目录判定的结论 {Excel行号: True/False})
+        行的年份在已导入的年份内且目录中有该标题时：发表日期之一与 Excel 一致即匹配，否则判为不匹配
+        """
+        known = self.lookup(task.title for task in tasks)
+        years = self.covered_years()
+        todo = []
+        resolved = {}
+        for task in tasks:
+            dates = known.get(task.title)
+            if dates is None or int(task.date[:4]) not in years:
+                todo.append(task)
+            else:
+                resolved[task.row] = task.date in dates
+        return todo, resolved
+
+
+def report_trace_summary(report_widget=None):
+    """TRACE_WEBDRIVER 开启时输出整次运行的命令统计，并导出折叠栈"""
+    tracer = get_command_tracer()
+    if tracer is None:
+        return
+    text = tracer.summary()
+    try:
+        folded_path, summary_path = tracer.export()
+        text += f"\n\n折叠栈（flamegraph.pl / speedscope）：{folded_path}\n摘要：{summary_path}"
+    except OSError as e:
+        text += f"\n\n导出追踪结果失败：{e}"
+    print("\n" + text)
+    if report_widget is not None:
+        report_widget.insert(tk.END, "\n" + text + "\n")
+        report_widget.see(tk.END)
+        report_widget.update()
 
 
 # ======== 处理整个 Excel：逐行校验 ========
@@ -767,80 +2761,156 @@ def process_excel(filepath, report_widget):
     # 更新GUI显示
     report_widget.insert(tk.END, f"开始处理文件：{os.path.basename(filepath)}\n")
     report_widget.insert(tk.END, f"共 {len(df)} 行数据需要校验\n")
-    report_widget.insert(tk.END, "正在启动浏览器...\n")
+    
+    # 启动浏览器前一次性校验/规范化整列日期和标题，先报告所有无效行
+    tasks, skipped = preprocess_rows(df)
+    report_widget.insert(tk.END, f"预处理完成：有效 {len(tasks)} 行，跳过 {len(skipped)} 行\n")
+    for excel_row_num, reason in skipped:
+        report_widget.insert(tk.END, f"第 {excel_row_num} 行：{reason}\n")
+    
+    # 增量校验：未改动的行沿用上次结论
+    workbook = VerifyHistory.workbook_key(filepath)
+    history = None
+    carried = {}
+    if INCREMENTAL_VERIFY:
+        history = VerifyHistory()
+        tasks, carried = history.split(workbook, tasks)
+        report_widget.insert(tk.END, f"增量校验：沿用上次结论 {len(carried)} 行，需要校验 {len(tasks)} 行\n")
+    # 离线目录：已导入题录覆盖到的行本地判定，不打开浏览器
+    catalog_resolved = {}
+    if CATALOG_VERIFY and CatalogIndex.exists():
+        catalog = CatalogIndex()
+        try:
+            tasks, catalog_resolved = catalog.split(tasks)
+        finally:
+            catalog.close()
+        report_widget.insert(tk.END, f"离线目录：本地判定 {len(catalog_resolved)} 行，需要浏览器校验 {len(tasks)} 行\n")
+    report_widget.see(tk.END)
     report_widget.update()
     
-    # 启动浏览器
-    driver = make_driver()
+    # 浏览器由守护对象负责启动、健康检查与回收
+    supervisor = DriverSupervisor()
+    prefetcher = DatePrefetcher(supervisor) if PREFETCH_NEXT_DATE else None
     
     try:
-        # 先打开一次页面，让用户看到浏览器窗口
-        open_page_with_retry(driver, BASE_SEARCH_URL)
-        time.sleep(2)
-        
         errors = []
-        total_rows = len(df)
+        for excel_row_num, found in sorted(carried.items()):
+            if not found:
+                errors.append(excel_row_num)
+                report_widget.insert(tk.END, f"  ⚠ 第 {excel_row_num} 行可能有问题（沿用上次结论）\n")
+        for excel_row_num, found in sorted(catalog_resolved.items()):
+            if not found:
+                errors.append(excel_row_num)
+                report_widget.insert(tk.END, f"  ⚠ 第 {excel_row_num} 行可能有问题（离线目录中该标题的发表日期不同）\n")
         
-        # 遍历每一行
-        for idx, row in df.iterrows():
-            pub_date = row["发布时间"]
-            title = row["标题"]
-            
-            # 格式化日期为字符串
-            if pd.isna(pub_date):
-                report_widget.insert(tk.END, f"第 {idx + 2} 行：发布时间为空，跳过\n")
-                report_widget.update()
-                continue
-            
-            if pd.isna(title) or not isinstance(title, str) or not title.strip():
-                report_widget.insert(tk.END, f"第 {idx + 2} 行：标题为空，跳过\n")
-                report_widget.update()
-                continue
-            
-            # 转换日期格式
-            if isinstance(pub_date, (pd.Timestamp, datetime)):
-                pub_date_str = pub_date.strftime("%Y-%m-%d")
-            else:
-                # 尝试解析字符串日期
-                try:
-                    pub_date_str = str(pub_date).strip().replace('/', '-')
-                    # 验证日期格式
-                    datetime.strptime(pub_date_str, '%Y-%m-%d')
-                except:
-                    report_widget.insert(tk.END, f"第 {idx + 2} 行：日期格式错误 - {pub_date}\n")
-                    report_widget.update()
-                    continue
-            
+        if tasks:
+            report_widget.insert(tk.END, "正在启动浏览器...\n")
+            report_widget.update()
+            driver = supervisor.start()
+            # 先打开一次页面，让用户看到浏览器窗口
+            open_page_with_retry(driver, BASE_SEARCH_URL)
+            time.sleep(2)
+        
+        # 按日期分组：同一日期只打开/选择一次，结果列表扫描一遍即可判定该日期下的所有标题
+        date_groups = {}
+        for task in tasks:
+            date_groups.setdefault(task.date, []).append(task)
+        
+        # 定义调试回调函数，将调试信息输出到GUI
+        def debug_to_gui(msg):
+            report_widget.insert(tk.END, f"  {msg}\n")
+            report_widget.see(tk.END)
+            report_widget.update()
+        supervisor.debug_callback = debug_to_gui
+        
+        def check_group(pub_date_str, group, next_date=None) -> list:
+            """
+            检查一个日期分组并输出每行结论，返回需要稍后重试的行：
+            超过时间预算或会话崩溃时为整个分组，否则为结论是“未能校验”的行
+            """
             # 更新进度
-            progress = f"正在检查第 {idx + 2}/{total_rows + 1} 行：{title[:30]}..."
+            rows_desc = "、".join(str(r) for r, _, _ in group[:5]) + ("..." if len(group) > 5 else "")
+            progress = f"正在检查日期 {pub_date_str}：第 {rows_desc} 行（共 {len(group)} 行）"
             report_widget.insert(tk.END, f"\n{progress}\n")
             report_widget.see(tk.END)
             report_widget.update()
             
-            # 定义调试回调函数，将调试信息输出到GUI
-            def debug_to_gui(msg):
-                report_widget.insert(tk.END, f"  {msg}\n")
-                report_widget.see(tk.END)
-                report_widget.update()
-            
-            # 检查标题是否能在该日期下找到
-            found = check_title_at_date(driver, pub_date_str, title, debug_callback=debug_to_gui)
-            
-            if not found:
-                excel_row_num = idx + 2  # Excel行号（第1行是表头）
-                errors.append(excel_row_num)
-                error_msg = f"第 {excel_row_num} 行可能有问题：标题与发布时间不匹配"
-                print(f"问题行：Excel 第 {excel_row_num} 行标题与发布时间可能不匹配")
-                report_widget.insert(tk.END, f"  ⚠ {error_msg}\n")
+            # 检查这些标题是否能在该日期下找到
+            tracer = get_command_tracer()
+            if tracer:
+                tracer.begin_row(f"{pub_date_str}（第 {rows_desc} 行）")
+            titles = [title for _, _, title in group]
+            try:
+                if prefetcher:
+                    results = prefetcher.check(len(group), pub_date_str, titles, next_date=next_date,
+                                               debug_callback=debug_to_gui)
+                else:
+                    results = supervisor.run(
+                        len(group), check_titles_at_date,
+                        pub_date_str, titles, debug_callback=debug_to_gui
+                    )
+            except RowTimeout as e:
+                report_widget.insert(tk.END, f"  ⏱ 第 {rows_desc} 行超时（{e}），稍后重试\n")
                 report_widget.see(tk.END)
                 report_widget.update()
-            else:
-                report_widget.insert(tk.END, f"  ✓ 第 {idx + 2} 行匹配\n")
+                return group
+            except SessionCrashed as e:
+                report_widget.insert(tk.END, f"  ⚠ 第 {rows_desc} 行未能校验（{e}），稍后重试\n")
                 report_widget.see(tk.END)
                 report_widget.update()
+                return group
+            finally:
+                if tracer:
+                    debug_to_gui(tracer.end_row())
+            
+            retry = []
+            for task in group:
+                excel_row_num, _, title = task
+                if results.get(title) is None:
+                    retry.append(task)
+                    report_widget.insert(tk.END, f"  ⚠ 第 {excel_row_num} 行未能校验，稍后重试\n")
+                elif not results[title]:
+                    errors.append(excel_row_num)
+                    error_msg = f"第 {excel_row_num} 行可能有问题：标题与发布时间不匹配"
+                    print(f"问题行：Excel 第 {excel_row_num} 行标题与发布时间可能不匹配")
+                    report_widget.insert(tk.END, f"  ⚠ {error_msg}\n")
+                else:
+                    report_widget.insert(tk.END, f"  ✓ 第 {excel_row_num} 行匹配\n")
+            report_widget.see(tk.END)
+            report_widget.update()
+            if history:
+                # 只记录确定的结论，未能校验的行下次仍会重新校验
+                history.record(workbook, [(d, title, results[title]) for _, d, title in group
+                                          if results.get(title) is not None])
+            return retry
+        
+        def run_schedule(groups):
+            """依次检查 [(日期, 分组), ...]，返回需要重试的 [(日期, 行), ...]"""
+            timed_out = []
+            for index, (pub_date_str, group) in enumerate(groups):
+                next_date = groups[index + 1][0] if index + 1 < len(groups) else None
+                retry = check_group(pub_date_str, group, next_date)
+                if retry:
+                    timed_out.append((pub_date_str, retry))
+            return timed_out
         
-        # 关闭浏览器
-        driver.quit()
+        # 超时、会话崩溃或未能校验的日期放到最后再重试一次，避免少数异常行拖住整批
+        timed_out = run_schedule(list(date_groups.items()))
+        if timed_out:
+            report_widget.insert(tk.END, f"\n重试超时或未能校验的 {len(timed_out)} 个日期...\n")
+            timed_out = run_schedule(timed_out)
+        unverified = sorted(r for _, group in timed_out for r, _, _ in group)
+        
+        errors.sort()
+        
+        # 关闭浏览器（预取流水线的两个会话可能已交换，两个都要关闭）
+        if prefetcher:
+            prefetcher.stop()
+            prefetcher.active.stop()
+        supervisor.stop()
+        if history:
+            history.close()
+        report_trace_summary(report_widget)
         
         # 在控制台打印所有问题行
         print("\n" + "="*50)
@@ -850,6 +2920,8 @@ def process_excel(filepath, report_widget):
                 print(f"  问题行：Excel 第 {r} 行")
         else:
             print("所有行看起来都匹配 ✓")
+        if unverified:
+            print(f"另有 {len(unverified)} 行重试后仍未能校验（超时、会话崩溃或页面出错）：{unverified}")
         print("="*50)
         
         # 在GUI文本框里输出最终结果
@@ -861,6 +2933,10 @@ def process_excel(filepath, report_widget):
                 report_widget.insert(tk.END, f"  第 {r} 行\n")
         else:
             report_widget.insert(tk.END, "所有行看起来都匹配 ✓\n")
+        if unverified:
+            report_widget.insert(tk.END, f"另有 {len(unverified)} 行重试后仍未能校验（超时、会话崩溃或页面出错）：\n")
+            for r in unverified:
+                report_widget.insert(tk.END, f"  第 {r} 行\n")
         report_widget.see(tk.END)
         report_widget.update()
         
@@ -869,7 +2945,528 @@ def process_excel(filepath, report_widget):
         print(error_msg)
         report_widget.insert(tk.END, f"\n错误：{error_msg}\n")
         report_widget.update()
-        driver.quit()
+        if prefetcher:
+            prefetcher.stop()
+            prefetcher.active.stop()
+        supervisor.stop()
+        if history:
+            history.close()
+
+
+# ======== 分布式模式：协调者 + 多个 worker 共享 SQLite 任务队列 ========
+class WorkQueue:
+    """
+    基于 SQLite 的持久化任务队列，一个任务 = 一个日期分组（同一日期的若干行）
+    worker 领取任务时获得租约，执行期间定期续租；租约过期（worker 崩溃/失联）的任务会被重新分配，
+    超过 QUEUE_MAX_ATTEMPTS 次仍未完成的任务由协调者标记为失败。
+    队列文件只能由同一台机器上的进程直接打开（WAL 模式与 SQLite 文件锁在 NFS/SMB 等网络文件系统上不可靠），
+    其他机器上的 worker 通过协调者提供的 QueueServer 访问（RemoteQueue）。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                pub_date TEXT NOT NULL,
+                items TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT
+            )
+            """
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def reset(self, groups):
+        """清空队列并放入新任务，groups: [(日期, [(Excel行号, 标题), ...]), ...]"""
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.executemany(
+                "INSERT INTO tasks (pub_date, items) VALUES (?, ?)",
+                [(d, json.dumps(items, ensure_ascii=False)) for d, items in groups],
+            )
+
+    def claim(self, worker: str, lease_seconds: float = None):
+        """领取一个待处理或租约已过期的任务，返回 (任务id, 日期, [(Excel行号, 标题), ...])，没有则返回 None"""
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                """
+                SELECT id, pub_date, items FROM tasks
+                WHERE attempts < ? AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                ORDER BY attempts, id LIMIT 1
+                """,
+                (QUEUE_MAX_ATTEMPTS, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, row[0]),
+            )
+        task_id, pub_date, items = row
+        return task_id, pub_date, [tuple(x) for x in json.loads(items)]
+
+    def heartbeat(self, task_id: int, worker: str, lease_seconds: float = None) -> bool:
+        """续租；返回 False 表示租约已被收回（任务已被重新分配或已完成）"""
+        lease_seconds = lease_seconds or QUEUE_LEASE_SECONDS
+        cur = self._conn.execute(
+            "UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def release(self, task_id: int, worker: str):
+        """
+        放弃租约，把任务放回待处理（如超时）；已用的尝试次数保留，claim 时排在尝试次数更少的任务之后
+        尝试次数已用完的任务直接标记为失败
+        """
+        self._conn.execute(
+            """
+            UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (QUEUE_MAX_ATTEMPTS, task_id, worker),
+        )
+
+    def complete(self, task_id: int, worker: str, result: dict) -> bool:
+        """
+        提交结果 {Excel行号: True/False/None}，只有当前仍持有该任务租约的 worker 能提交
+        租约已被收回（任务已重新分配、已完成，或协调者 reset 后同一 id 已是新任务）时忽略并返回 False
+        """
+        cur = self._conn.execute(
+            "UPDATE tasks SET status = 'done', result = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(result), task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def reap(self) -> int:
+        """把重试次数用完且租约已过期的任务标记为失败，返回标记数量"""
+        cur = self._conn.execute(
+            """
+            UPDATE tasks SET status = 'failed'
+            WHERE attempts >= ? AND status = 'leased' AND lease_until < ?
+            """,
+            (QUEUE_MAX_ATTEMPTS, time.time()),
+        )
+        return cur.rowcount
+
+    def counts(self) -> dict:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for status, n in self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[status] = n
+        return counts
+
+    def finished(self) -> bool:
+        c = self.counts()
+        return c["pending"] == 0 and c["leased"] == 0
+
+    def results(self):
+        """返回 (结果 {Excel行号: True/False/None}, 失败任务涉及的 Excel 行号列表)"""
+        found = {}
+        failed_rows = []
+        for status, items, result in self._conn.execute("SELECT status, items, result FROM tasks"):
+            if status == "done":
+                found.update({int(r): None if v is None else bool(v) for r, v in json.loads(result).items()})
+            else:
+                failed_rows.extend(r for r, _ in json.loads(items))
+        return found, sorted(failed_rows)
+
+
+class QueueServer(socketserver.ThreadingTCPServer):
+    """
+    协调者在本机 SQLite 队列前提供的 TCP 服务，供其他机器上的 worker 使用
+    协议：每行一个 JSON 请求 {"op": 方法名, "args": [...]}，每行一个 JSON 应答 {"ok": 返回值} 或 {"error": 信息}
+    每个连接在自己的处理线程里使用单独的 SQLite 连接
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    # worker 可以调用的 WorkQueue 方法
+    OPS = ("claim", "heartbeat", "release", "complete", "finished")
+
+    def __init__(self, queue_path: str, address):
+        self.queue_path = queue_path
+        super().__init__(address, _QueueRequestHandler)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _QueueRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        queue = WorkQueue(self.server.queue_path)
+        try:
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op not in QueueServer.OPS:
+                        raise ValueError(f"不支持的操作：{op}")
+                    reply = {"ok": getattr(queue, op)(*request.get("args", []))}
+                except Exception as e:
+                    reply = {"error": str(e)}
+                self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+        finally:
+            queue.close()
+
+
+class RemoteQueue:
+    """通过 QueueServer 访问协调者上的队列，方法与 WorkQueue 中 worker 用到的部分一致"""
+
+    def __init__(self, address: str, timeout: float = 60):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port or QUEUE_SERVER_PORT))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._file = self._sock.makefile("rwb")
+
+    def _call(self, op: str, *args):
+        payload = (json.dumps({"op": op, "args": args}, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            # 连接断开（协调者重启、网络抖动）时重连一次
+            for attempt in range(2):
+                try:
+                    if self._file is None:
+                        self._connect()
+                    self._file.write(payload)
+                    self._file.flush()
+                    line = self._file.readline()
+                    if not line:
+                        raise ConnectionError("协调者关闭了连接")
+                    break
+                except OSError:
+                    self.close()
+                    if attempt:
+                        raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"队列服务出错：{reply['error']}")
+        return reply["ok"]
+
+    def claim(self, worker: str, lease_seconds: float = None):
+        task = self._call("claim", worker, lease_seconds)
+        if task is None:
+            return None
+        task_id, pub_date, items = task
+        return task_id, pub_date, [tuple(x) for x in items]
+
+    def heartbeat(self, task_id: int, worker: str, lease_seconds: float = None) -> bool:
+        return self._call("heartbeat", task_id, worker, lease_seconds)
+
+    def release(self, task_id: int, worker: str):
+        self._call("release", task_id, worker)
+
+    def complete(self, task_id: int, worker: str, result: dict) -> bool:
+        return self._call("complete", task_id, worker, result)
+
+    def finished(self) -> bool:
+        return self._call("finished")
+
+    def close(self):
+        for obj in (self._file, self._sock):
+            if obj is not None:
+                try:
+                    obj.close()
+                except OSError:
+                    pass
+        self._file = None
+        self._sock = None
+
+
+def open_work_queue(queue_path: str = None, server: str = None):
+    """worker 使用的队列：指定 server（主机:端口）时经协调者的 QueueServer 访问，否则直接打开本机队列文件"""
+    return RemoteQueue(server) if server else WorkQueue(queue_path)
+
+
+class _LeaseKeeper(threading.Thread):
+    """worker 执行任务期间在后台定期续租（单独的队列连接）"""
+
+    def __init__(self, open_queue, task_id: int, worker: str):
+        super().__init__(daemon=True)
+        self.open_queue = open_queue
+        self.task_id = task_id
+        self.worker = worker
+        self._stop_event = threading.Event()
+
+    def run(self):
+        queue = self.open_queue()
+        try:
+            while not self._stop_event.wait(QUEUE_LEASE_SECONDS / 3):
+                if not queue.heartbeat(self.task_id, self.worker):
+                    print(f"[worker] 任务 {self.task_id} 的租约已被收回")
+                    break
+        finally:
+            queue.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(queue_path: str = None, worker_id: str = None, poll_interval: float = 2, server: str = None,
+               check=check_titles_at_date, browser_factory=None):
+    """
+    worker：从队列领取日期分组，用 check（默认为现有的 check_titles_at_date 流程）校验后把结果写回，
+    队列中没有待处理/执行中的任务时退出
+    与协调者在同一台机器时直接打开 queue_path；在其他机器上时用 server 指定协调者的 主机:端口
+    check(driver, 日期, [标题, ...]) 返回 {标题: True/False/None}；browser_factory 传给 DriverSupervisor，
+    二者可替换为不启动 Chrome 的实现，用于在一台机器上测试多个 worker 进程
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    def open_queue():
+        return open_work_queue(queue_path, server)
+
+    queue = open_queue()
+    supervisor = DriverSupervisor(factory=browser_factory)
+    print(f"[worker] {worker_id} 启动，队列：{server or queue_path}")
+    try:
+        while True:
+            task = queue.claim(worker_id)
+            if task is None:
+                if queue.finished():
+                    break
+                time.sleep(poll_interval)
+                continue
+            task_id, pub_date_str, items = task
+            print(f"[worker] 领取任务 {task_id}：日期 {pub_date_str}，{len(items)} 行")
+            keeper = _LeaseKeeper(open_queue, task_id, worker_id)
+            keeper.start()
+            tracer = get_command_tracer()
+            if tracer:
+                tracer.begin_row(f"任务 {task_id} {pub_date_str}（{len(items)} 行）")
+            try:
+                results = supervisor.run(
+                    len(items), check, pub_date_str, [title for _, title in items]
+                )
+            except (RowTimeout, SessionCrashed) as e:
+                # 放回队列，排在尝试次数更少的任务之后重试
+                print(f"[worker] 任务 {task_id} 未能完成（{e}），放回队列稍后重试")
+                queue.release(task_id, worker_id)
+                continue
+            finally:
+                keeper.stop()
+                if tracer:
+                    print(tracer.end_row())
+            verdicts = {row: results.get(title) for row, title in items}
+            if any(v is None for v in verdicts.values()):
+                # 有行未能校验（页面打不开、日期选不上、查找中途出错）时与超时一样放回队列重试，
+                # 尝试次数用完后任务标记为失败，协调者把其中的行列为未校验
+                print(f"[worker] 任务 {task_id} 有行未能校验，放回队列稍后重试")
+                queue.release(task_id, worker_id)
+                continue
+            if not queue.complete(task_id, worker_id, verdicts):
+                print(f"[worker] 任务 {task_id} 的租约已被收回，结果丢弃")
+    finally:
+        supervisor.stop()
+        queue.close()
+        report_trace_summary()
+    print(f"[worker] {worker_id} 没有剩余任务，退出")
+
+
+def run_coordinator(filepath: str, queue_path: str, poll_interval: float = 5, listen: str = None) -> list:
+    """
+    协调者：读取 Excel、预处理并按日期分组放入队列，等待所有 worker 完成后汇总
+    listen（主机:端口）不为空时启动 QueueServer，供其他机器上的 worker 领取任务
+    返回问题行（Excel 行号）列表
+    """
+    df = pd.read_excel(filepath)
+    missing_cols = [col for col in ["发布时间", "标题"] if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Excel 必须包含列：['发布时间', '标题']，缺少：{missing_cols}")
+
+    tasks, skipped = preprocess_rows(df)
+    print(f"[协调者] {os.path.basename(filepath)}：有效 {len(tasks)} 行，跳过 {len(skipped)} 行")
+    for excel_row_num, reason in skipped:
+        print(f"  第 {excel_row_num} 行：{reason}")
+
+    workbook = VerifyHistory.workbook_key(filepath)
+    carried = {}
+    if INCREMENTAL_VERIFY:
+        history = VerifyHistory()
+        try:
+            tasks, carried = history.split(workbook, tasks)
+        finally:
+            history.close()
+        print(f"[协调者] 增量校验：沿用上次结论 {len(carried)} 行，需要校验 {len(tasks)} 行")
+    catalog_resolved = {}
+    if CATALOG_VERIFY and CatalogIndex.exists():
+        catalog = CatalogIndex()
+        try:
+            tasks, catalog_resolved = catalog.split(tasks)
+        finally:
+            catalog.close()
+        print(f"[协调者] 离线目录：本地判定 {len(catalog_resolved)} 行，需要浏览器校验 {len(tasks)} 行")
+
+    date_groups = {}
+    for task in tasks:
+        date_groups.setdefault(task.date, []).append((task.row, task.title))
+    queue = WorkQueue(queue_path)
+    server = None
+    try:
+        queue.reset(list(date_groups.items()))
+        print(f"[协调者] 已放入 {len(date_groups)} 个日期分组，等待 worker 处理（队列：{queue_path}）")
+        if listen:
+            host, _, port = listen.rpartition(":")
+            server = QueueServer(queue_path, (host or "0.0.0.0", int(port or QUEUE_SERVER_PORT)))
+            server.start()
+            print(f"[协调者] 队列服务已启动：{host or '0.0.0.0'}:{server.server_address[1]}，"
+                  f"其他机器上的 worker 使用 --server 本机地址:{server.server_address[1]}")
+
+        last = None
+        while True:
+            reaped = queue.reap()
+            if reaped:
+                print(f"[协调者] {reaped} 个任务重试次数已用完，标记为失败")
+            counts = queue.counts()
+            if counts != last:
+                print(f"[协调者] 待处理 {counts['pending']}，执行中 {counts['leased']}，"
+                      f"完成 {counts['done']}，失败 {counts['failed']}")
+                last = counts
+            if counts["pending"] == 0 and counts["leased"] == 0:
+                break
+            time.sleep(poll_interval)
+
+        results, failed_rows = queue.results()
+        if server is not None:
+            # 再服务一个轮询周期，让空闲等待中的远程 worker 查到“已完成”后正常退出
+            time.sleep(poll_interval)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        queue.close()
+
+    if INCREMENTAL_VERIFY:
+        history = VerifyHistory()
+        try:
+            history.record(workbook, [(t.date, t.title, results[t.row]) for t in tasks
+                                      if results.get(t.row) is not None])
+        finally:
+            history.close()
+    results.update(carried)
+    results.update(catalog_resolved)
+    errors = sorted(r for r, ok in results.items() if ok is False)
+    failed_rows = sorted(set(failed_rows) | {r for r, ok in results.items() if ok is None})
+    print("\n" + "="*50)
+    if errors:
+        print(f"共发现 {len(errors)} 行可能有问题：")
+        for r in errors:
+            print(f"  问题行：Excel 第 {r} 行")
+    else:
+        print("所有行看起来都匹配 ✓")
+    if failed_rows:
+        print(f"另有 {len(failed_rows)} 行多次尝试仍未完成校验：{failed_rows}")
+    print("="*50)
+    return errors
+
+
+def import_catalog(paths, db_path: str = CATALOG_DB) -> int:
+    """把知网导出的题录文件导入离线目录，返回目录中的记录总数"""
+    catalog = CatalogIndex(db_path)
+    try:
+        for path in paths:
+            total, kept = catalog.import_file(path)
+            print(f"[离线目录] {os.path.basename(path)}：{total} 条题录，收录带完整日期的 {kept} 条")
+        size = catalog.size()
+    finally:
+        catalog.close()
+    print(f"[离线目录] 目录共 {size} 条记录（{db_path}）")
+    return size
+
+
+def run_offline(filepath: str, live: bool = True, db_path: str = CATALOG_DB) -> list:
+    """
+    按离线目录校验工作簿，不启动浏览器；live=True 时目录未覆盖的行再走浏览器校验（check_titles_at_date）
+    返回问题行（Excel 行号）列表
+    """
+    df = pd.read_excel(filepath)
+    missing_cols = [col for col in ["发布时间", "标题"] if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Excel 必须包含列：['发布时间', '标题']，缺少：{missing_cols}")
+
+    tasks, skipped = preprocess_rows(df)
+    print(f"[离线校验] {os.path.basename(filepath)}：有效 {len(tasks)} 行，跳过 {len(skipped)} 行")
+    for excel_row_num, reason in skipped:
+        print(f"  第 {excel_row_num} 行：{reason}")
+
+    catalog = CatalogIndex(db_path)
+    try:
+        tasks, results = catalog.split(tasks)
+    finally:
+        catalog.close()
+    print(f"[离线校验] 目录判定 {len(results)} 行，目录未覆盖 {len(tasks)} 行")
+
+    if tasks and live:
+        date_groups = {}
+        for task in tasks:
+            date_groups.setdefault(task.date, []).append(task)
+        supervisor = DriverSupervisor()
+
+        def run_schedule(groups, last=False):
+            """依次校验 [(日期, 行), ...]，返回超时、会话崩溃或未能校验、需要重试的 [(日期, 行), ...]"""
+            retry = []
+            for pub_date_str, group in groups:
+                print(f"[离线校验] 浏览器校验日期 {pub_date_str}（{len(group)} 行）")
+                try:
+                    found = supervisor.run(len(group), check_titles_at_date, pub_date_str,
+                                           [task.title for task in group])
+                except (RowTimeout, SessionCrashed) as e:
+                    print(f"[离线校验] 日期 {pub_date_str} 未能完成（{e}）"
+                          + ("，列为未校验" if last else "，稍后重试"))
+                    retry.append((pub_date_str, group))
+                    continue
+                for task in group:
+                    results[task.row] = found.get(task.title)
+                left = [task for task in group if results[task.row] is None]
+                if left:
+                    retry.append((pub_date_str, left))
+            return retry
+
+        try:
+            # 超时、会话崩溃或未能校验的日期放到最后再重试一次
+            retry = run_schedule(list(date_groups.items()))
+            if retry:
+                print(f"[离线校验] 重试未完成的 {len(retry)} 个日期...")
+                run_schedule(retry, last=True)
+        finally:
+            supervisor.stop()
+        # 浏览器未能校验（超时、会话崩溃或结论为 None）的行与目录未覆盖的行一样列为未校验
+        tasks = [task for task in tasks if results.get(task.row) is None]
+        for task in tasks:
+            results.pop(task.row, None)
+
+    errors = sorted(r for r, ok in results.items() if not ok)
+    print("\n" + "="*50)
+    if errors:
+        print(f"共发现 {len(errors)} 行可能有问题：")
+        for r in errors:
+            print(f"  问题行：Excel 第 {r} 行")
+    else:
+        print("目录判定的行看起来都匹配 ✓" if tasks else "所有行看起来都匹配 ✓")
+    if tasks:
+        reason = "浏览器未能校验" if live else "不在离线目录中"
+        print(f"另有 {len(tasks)} 行{reason}，未校验：{[task.row for task in tasks]}")
+    print("="*50)
+    return errors
 
 
 # ======== GUI 部分：文件选择 + 报错窗口 ========
@@ -947,7 +3544,48 @@ class App(tk.Tk):
         t.start()
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    不带参数时启动 GUI；coordinator / worker 子命令用于多进程、多机器分布式校验；
+    import-catalog / offline 子命令用于导入知网题录并离线校验
+    """
+    parser = argparse.ArgumentParser(description="知网文章标题与发布时间校验工具")
+    sub = parser.add_subparsers(dest="command")
+    p_coord = sub.add_parser("coordinator", help="读取 Excel，按日期分组放入任务队列并汇总结果")
+    p_coord.add_argument("excel", help="待校验的 Excel 文件")
+    p_coord.add_argument("--queue", default="cnki_queue.db", help="SQLite 队列文件（放在本机磁盘上，不要放在网络共享目录）")
+    p_coord.add_argument("--listen", nargs="?", const=f"0.0.0.0:{QUEUE_SERVER_PORT}", default=None,
+                         help=f"为其他机器上的 worker 提供队列服务，默认 0.0.0.0:{QUEUE_SERVER_PORT}")
+    p_worker = sub.add_parser("worker", help="从任务队列领取日期分组并用浏览器校验")
+    p_worker.add_argument("--queue", default="cnki_queue.db", help="SQLite 队列文件（与协调者在同一台机器时使用）")
+    p_worker.add_argument("--server", default=None, help="协调者的队列服务地址 主机:端口（在其他机器上运行时使用）")
+    p_worker.add_argument("--id", default=None, help="worker 名称，默认 主机名-进程号")
+    p_import = sub.add_parser("import-catalog", help="导入知网导出的题录文件（CSV/Excel/RefWorks/NoteExpress/EndNote）到离线目录")
+    p_import.add_argument("files", nargs="+", help="题录文件")
+    p_offline = sub.add_parser("offline", help="按离线目录校验 Excel，目录未覆盖的行再用浏览器校验")
+    p_offline.add_argument("excel", help="待校验的 Excel 文件")
+    p_offline.add_argument("--no-live", action="store_true", help="完全不启动浏览器，目录未覆盖的行只列出不校验")
+    # 用 parse_known_args：打包后的 macOS App 启动时可能带有系统附加参数
+    args, _ = parser.parse_known_args(argv)
+
+    if args.command == "coordinator":
+        errors = run_coordinator(args.excel, args.queue, listen=args.listen)
+        return 1 if errors else 0
+    if args.command == "worker":
+        run_worker(args.queue, worker_id=args.id, server=args.server)
+        return 0
+    if args.command == "import-catalog":
+        import_catalog(args.files)
+        return 0
+    if args.command == "offline":
+        errors = run_offline(args.excel, live=not args.no_live)
+        return 1 if errors else 0
+
     app = App()
     app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
 
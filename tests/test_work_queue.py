@@ -0,0 +1,94 @@
+"""
+分布式模式的任务队列测试：在一台机器上启动多个 worker 进程，用假的浏览器和校验函数代替 Chrome
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import check_cnki_excel as cnki  # noqa: E402
+
+
+class FakeDriver:
+    """DriverSupervisor 只用到健康检查、页面加载超时和退出"""
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+
+def fake_check(driver, pub_date_str, titles):
+    """标题以“缺”开头判为未找到，含“未能”的判为未能校验，其余判为找到"""
+    time.sleep(0.05)
+    return {t: None if "未能" in t else not t.startswith("缺") for t in titles}
+
+
+def _worker(queue_path, worker_id):
+    cnki.run_worker(queue_path, worker_id=worker_id, poll_interval=0.1,
+                    check=fake_check, browser_factory=FakeDriver)
+
+
+def _run_workers(queue_path, count):
+    workers = [
+        multiprocessing.Process(target=_worker, args=(queue_path, f"w{i}"))
+        for i in range(count)
+    ]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+
+def test_workers_finish_all_tasks_and_reclaim_expired_lease(tmp_path):
+    queue_path = str(tmp_path / "queue.db")
+    groups = [
+        (f"2024-01-{day:02d}", [(day * 10, f"论文{day}"), (day * 10 + 1, f"缺失{day}")])
+        for day in range(1, 9)
+    ]
+    queue = cnki.WorkQueue(queue_path)
+    try:
+        queue.reset(groups)
+        # 模拟领取任务后崩溃的 worker：租约 1 秒后过期，应被其他 worker 重新领取
+        dead_id, _, _ = queue.claim("dead-worker", lease_seconds=1)
+
+        _run_workers(queue_path, 3)
+
+        assert queue.counts() == {"pending": 0, "leased": 0, "done": len(groups), "failed": 0}
+        # 崩溃的 worker 迟到的结果不能覆盖重新分配后的结论
+        assert not queue.complete(dead_id, "dead-worker", {"10": False, "11": True})
+        results, failed_rows = queue.results()
+    finally:
+        queue.close()
+    assert failed_rows == []
+    assert results == {row: not title.startswith("缺") for _, items in groups for row, title in items}
+
+
+def test_unverified_task_fails_after_max_attempts(tmp_path):
+    queue_path = str(tmp_path / "queue.db")
+    queue = cnki.WorkQueue(queue_path)
+    try:
+        queue.reset([
+            ("2024-02-01", [(2, "论文甲")]),
+            ("2024-02-02", [(3, "论文乙"), (4, "未能打开")]),
+        ])
+
+        _run_workers(queue_path, 2)
+
+        assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 1}
+        attempts = queue._conn.execute(
+            "SELECT attempts FROM tasks WHERE pub_date = '2024-02-02'"
+        ).fetchone()[0]
+        results, failed_rows = queue.results()
+    finally:
+        queue.close()
+    assert attempts == cnki.QUEUE_MAX_ATTEMPTS
+    assert results == {2: True}
+    assert failed_rows == [3, 4]